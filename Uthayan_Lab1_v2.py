@@ -1,73 +1,1335 @@
+import time
+
+STARTUP_BEGAN = time.perf_counter()  # For --profile-startup; taken first so it covers the imports
+
+import argparse
+import array
+import atexit
+import bisect
+import collections
+import contextlib
 import csv
+import dataclasses
 import os
+import re
+import secrets
 import shutil
+import signal
+import string
+import struct
+import sys
+import tempfile
 import getpass
-import statistics
-import time
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import mmap
+import random
+import threading
+import traceback
+import urllib.parse
+import zlib
+
+np = None  # NumPy is optional and only imported when GradeColumns needs it
+# Slow imports that only some paths need are also deferred to those paths
+asyncio = None  # GradeServer (--serve)
+sqlite3 = None  # SQLiteBackend (--backend sqlite)
+concurrent = None  # concurrent.futures, for the validation and import process pools
+
+try:
+    import fcntl
+except ImportError:  # Windows: FileLock then only covers the threads of this process
+    fcntl = None
 
 
 # CSV File Handling Class
 class CSVHandler:
+    backend = None  # None keeps the tables in CSV files; see SQLiteBackend
+    data_dir = None  # Folder holding the data files; None means the script's folder
+
+    @staticmethod
+    def use_backend(backend):
+        """ Switch storage (None for CSV files) and drop everything cached from the old one """
+        CSVHandler.backend = backend
+        record_store.invalidate()
+
     @staticmethod
     def get_file_path(filename):
         # Get the folder where the current Python file is located
-        script_dir = os.path.dirname(os.path.realpath(__file__))
+        script_dir = CSVHandler.data_dir or os.path.dirname(os.path.realpath(__file__))
         return os.path.join(script_dir, filename)
 
+    @staticmethod
     def read_csv(filename):
-        try:
-            file_path = CSVHandler.get_file_path(filename)
-            
-            with open(filename, mode='r', newline='', encoding= 'utf-8') as file:
-                reader = csv.reader(file)
-                data = []
-                for row in reader:
-                    row = [cell.strip() for cell in row]  # Strip whitespace from each item
-                    data.append(row)
-                return data
-        except FileNotFoundError:
-            print(f"File {filename} not found.")
-            return []
-    
+        return list(CSVHandler.iter_rows(filename))
+
     @staticmethod
-    def write_csv(filename, data, mode='a'):
+    def exists(filename):
+        if CSVHandler.backend is not None:
+            return CSVHandler.backend.exists(filename)
+        return os.path.exists(CSVHandler.get_file_path(filename))
+
+    @staticmethod
+    def signature(filename):
+        """ Return a value that changes whenever the stored table changes """
+        if CSVHandler.backend is not None:
+            return CSVHandler.backend.signature(filename)
+        signature = []
+        for path in (CSVHandler.get_file_path(filename), ChangeLog.log_path(filename)):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    @staticmethod
+    def _iter_file_rows(filename):
+        """ Yield the rows of a CSV file with pending change-log records applied """
         file_path = CSVHandler.get_file_path(filename)
+        # Take the file length and the pending log together under a shared
+        # lock, then parse only up to that length: an append or compaction
+        # that lands while the rows stream is never seen half-done
+        with FileLock.hold(filename, shared=True):
+            try:
+                file = open(file_path, mode='rb')
+            except FileNotFoundError:
+                print(f"File {filename} not found.")
+                return
+            size = os.fstat(file.fileno()).st_size
+            changes = ChangeLog.pending(filename)
+
+        with file:
+            # Strip whitespace from each item
+            rows = csv.reader(CSVHandler._lines(file, size))
+            yield from ChangeLog.replay(filename, ([cell.strip() for cell in row] for row in rows), changes)
+
+    @staticmethod
+    def _lines(file, size):
+        """ Decode the lines of a binary file that lie within its first size bytes """
+        for line in file:
+            if size <= 0:
+                return
+            if len(line) > size:
+                line = line[:size]
+            size -= len(line)
+            yield line.decode('utf-8')
+
+    @staticmethod
+    def iter_rows(filename):
+        """ Yield stripped rows one at a time as they are parsed """
+        if CSVHandler.backend is not None:
+            return CSVHandler.backend.iter_rows(filename)
+        return CSVHandler._iter_file_rows(filename)
+
+    @staticmethod
+    def write_csv(filename, data, mode='a', quiet=False):
+        """ Write rows to a CSV file; returns True if they were written """
+        file_path = CSVHandler.get_file_path(filename)
+        say = (lambda message: None) if quiet else print
+        if mode == 'a' and os.path.basename(filename) == 'students.csv':
+            errors = GradeValidator.validate_rows(data)
+            for index, reason in errors:
+                say(f"[!] Rejected {data[index]}: {reason}")
+            if errors:
+                return False
+        if CSVHandler.backend is not None:
+            CSVHandler.backend.write_rows(filename, data, mode)
+            say(f"Data written to {filename}: {data}")
+            return True
         try:
-            with open(filename, mode=mode, newline='', encoding= 'utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerows(data)
-            print(f"Data written to {filename}: {data}")
+            if mode == 'w':
+                CSVHandler._rewrite_file(filename, data)  # Never truncate in place
+                say(f"Data written to {filename}: {data}")
+                return True
+            with FileLock.hold(filename):
+                if ChangeLog.has_pending(filename):
+                    # Appending behind pending log records would let them shadow the new rows
+                    ChangeLog.append(filename, [('insert', row) for row in data])
+                    say(f"Data logged for {filename}: {data}")
+                else:
+                    with open(file_path, mode=mode, newline='', encoding= 'utf-8') as file:
+                        writer = csv.writer(file)
+                        writer.writerows(data)
+                    say(f"Data written to {filename}: {data}")
+                # Still under the lock, so no other writer's change hides behind the new signature
+                record_store.touch(filename)
+            return True
         except Exception as e:
-            print(f"An error occurred while writing to {filename}: {e}")
+            say(f"An error occurred while writing to {filename}: {e}")
+            return False
+
+    @staticmethod
+    def apply_changes(filename, changes):
+        """ Apply keyed (op, row) inserts/updates/deletes; a change-log append for CSV files """
+        if CSVHandler.backend is not None:
+            CSVHandler.backend.apply_changes(filename, changes)
+        else:
+            with FileLock.hold(filename):
+                ChangeLog.append(filename, changes)
+                record_store.touch(filename)
+
+    @staticmethod
+    def rewrite(filename, rows):
+        """ Replace the whole table with rows (header first) in one atomic step """
+        if CSVHandler.backend is not None:
+            CSVHandler.backend.write_rows(filename, list(rows), mode='w')
+        else:
+            CSVHandler._rewrite_file(filename, rows)
+
+    @staticmethod
+    def _rewrite_file(filename, rows):
+        file_path = CSVHandler.get_file_path(filename)
+        temp_path = file_path + '.tmp'
+        with FileLock.hold(filename), ChangeLog._lock:
+            with open(temp_path, mode='w', newline='', encoding='utf-8') as file:
+                csv.writer(file).writerows(rows)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, file_path)
+            # The rows already include anything the log held
+            if os.path.exists(ChangeLog.log_path(filename)):
+                os.remove(ChangeLog.log_path(filename))
+            record_store.touch(filename)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def appender(filename):
+        """ Yield a function that appends batches of rows through one buffered handle """
+        if CSVHandler.backend is not None:
+            yield lambda rows: CSVHandler.backend.write_rows(filename, rows, mode='a')
+            return
+        file_path = CSVHandler.get_file_path(filename)
+        handle = [None]  # The open file, reopened whenever a compaction replaced it
+
+        def write_rows(rows):
+            # Lock per batch, so other writers only wait for one batch
+            with FileLock.hold(filename):
+                if ChangeLog.has_pending(filename):
+                    # Appending behind pending log records would let them shadow the new rows
+                    ChangeLog.append(filename, [('insert', row) for row in rows])
+                else:
+                    file = handle[0]
+                    if file is None or os.fstat(file.fileno()).st_ino != os.stat(file_path).st_ino:
+                        if file is not None:
+                            file.close()
+                        file = handle[0] = open(file_path, mode='a', newline='',
+                                                encoding='utf-8', buffering=1 << 20)
+                    csv.writer(file).writerows(rows)
+                    file.flush()
+                record_store.touch(filename)
+
+        try:
+            yield write_rows
+        finally:
+            if handle[0] is not None:
+                handle[0].close()
+
+
+# Grade Validation
+class GradeValidator:
+    """Checks student rows before they are written to students.csv.
+
+    Large inputs are split into chunks and validated on a process pool;
+    the errors come back as (row_index, reason) in input order.
+    """
+    EMAIL_PATTERN = re.compile(r'^[^@\s,]+@[^@\s,]+$')
+    # Lowest mark for each letter grade, best grade first
+    GRADE_FLOORS = [('A', 89), ('A-', 85), ('B+', 78), ('B', 70), ('B-', 65),
+                    ('C+', 60), ('C', 55), ('C-', 50), ('D', 40), ('F', 0)]
+    MAX_MARKS = 100
+    CHUNK_SIZE = 5000
+    PARALLEL_THRESHOLD = 20000  # Below this a process pool costs more than it saves
+
+    @staticmethod
+    def grade_band(grade):
+        """Return the (lowest, highest) marks for a letter grade, or None."""
+        upper = GradeValidator.MAX_MARKS
+        for letter, floor in GradeValidator.GRADE_FLOORS:
+            if letter == grade:
+                return floor, upper
+            upper = floor - 1
+        return None
+
+    @staticmethod
+    def grade_for(mark):
+        """Return the letter grade whose band contains mark."""
+        for letter, floor in GradeValidator.GRADE_FLOORS:
+            if mark >= floor:
+                return letter
+        return GradeValidator.GRADE_FLOORS[-1][0]
+
+    @staticmethod
+    def validate_row(row, course_ids):
+        """Return the reason a row is invalid, or None."""
+        if len(row) != 6:
+            return f"expected 6 fields, got {len(row)}"
+        first_name, last_name, email, course_id, grade, marks = row
+        if not first_name or not last_name:
+            return "missing name"
+        if not GradeValidator.EMAIL_PATTERN.match(email):
+            return f"invalid email {email}"
+        if course_id not in course_ids:
+            return f"unknown course {course_id}"
+        try:
+            mark = int(marks)
+        except ValueError:
+            return f"marks not numeric: {marks}"
+        if not 0 <= mark <= GradeValidator.MAX_MARKS:
+            return f"marks out of range: {mark}"
+        band = GradeValidator.grade_band(grade)
+        if band is None:
+            return f"unknown grade {grade}"
+        if not band[0] <= mark <= band[1]:
+            return f"grade {grade} does not match marks {mark}"
+        return None
+
+    @staticmethod
+    def is_enrolled(email, course_id):
+        """Return True if students.csv already has a row for (email, course_id), the change-log key.
+
+        A point lookup: an unloaded table is read through its OffsetIndex.
+        """
+        return any(row[3] == course_id for row in record_store.find('students.csv', 'email', email))
+
+    @staticmethod
+    def _validate_chunk(chunk):
+        start, rows, course_ids = chunk
+        errors = []
+        for offset, row in enumerate(rows):
+            reason = GradeValidator.validate_row(row, course_ids)
+            if reason:
+                errors.append((start + offset, reason))
+        return errors
+
+    @staticmethod
+    def validate_rows(rows, course_ids=None, executor=None, workers=None):
+        """Validate rows and return [(row_index, reason)] in input order.
+
+        Inputs of PARALLEL_THRESHOLD rows or more are fanned out across a
+        process pool (the given executor, or a temporary one).
+        """
+        global concurrent
+        if course_ids is None:
+            course_ids = {course.course_id for course in Course.load_courses()}
+        course_ids = frozenset(course_ids)
+        chunks = [(start, rows[start:start + GradeValidator.CHUNK_SIZE], course_ids)
+                  for start in range(0, len(rows), GradeValidator.CHUNK_SIZE)]
+
+        if len(rows) < GradeValidator.PARALLEL_THRESHOLD or (workers or os.cpu_count() or 1) == 1:
+            results = map(GradeValidator._validate_chunk, chunks)
+        elif executor is not None:
+            results = executor.map(GradeValidator._validate_chunk, chunks)
+        else:
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(GradeValidator._validate_chunk, chunks))
+
+        # map() yields chunk results in submission order, so this stays sorted
+        return [error for chunk_errors in results for error in chunk_errors]
+
+    @staticmethod
+    def validate_import_batch(batch, course_ids, seen, executor=None):
+        """ Split a batch into accepted rows and (row_number, reason) rejects """
+        parsed = [row for _, row in batch if row is not None]
+        errors = dict(GradeValidator.validate_rows(parsed, course_ids, executor))
+
+        accepted, rejected, index = [], [], 0
+        for row_number, row in batch:
+            if row is None:
+                rejected.append((row_number, "malformed record"))
+                continue
+            reason = errors.get(index)
+            index += 1
+            email, course_id = row[2], row[3]
+            # A bulk import checks every row, so it loads the table once instead of one read per row
+            enrolled = reason is None and any(existing[3] == course_id for existing in
+                                              record_store.lookup('students.csv', 'email', email))
+            if reason is None and ((email, course_id) in seen or enrolled):
+                reason = f"duplicate record for {email} in {course_id}"
+            if reason:
+                rejected.append((row_number, reason))
+            else:
+                seen.add((email, course_id))
+                accepted.append(row)
+        return accepted, rejected
+
+
+# Advisory File Locking
+class FileLock:
+    """Advisory lock on one table, shared by every process using the data folder.
+
+    fcntl.flock is taken on a sidecar <file>.lock, which outlives the
+    os.replace of the table itself. Writers hold it exclusively; readers
+    hold it shared only while they snapshot the file length and change log.
+    A thread that already holds a table's lock may take it again. Always
+    take it before ChangeLog._lock. Without fcntl the lock falls back to
+    one that covers only this process. Every acquisition records how long
+    it waited; see stats().
+    """
+    SUFFIX = '.lock'
+
+    _local = threading.local()
+    _fallback = {}
+    _waits = {}  # table -> [acquired, contended, total wait, longest wait]
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def lock_path(filename):
+        return CSVHandler.get_file_path(filename) + FileLock.SUFFIX
+
+    @staticmethod
+    def _acquire(path, shared):
+        """ Take the lock; returns (release function, whether another holder made us wait) """
+        if fcntl is None:
+            with FileLock._stats_lock:
+                lock = FileLock._fallback.setdefault(path, threading.Lock())
+            contended = not lock.acquire(blocking=False)
+            if contended:
+                lock.acquire()
+            return lock.release, contended
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                contended = False
+            except BlockingIOError:
+                contended = True
+                fcntl.flock(fd, mode)
+        except BaseException:
+            os.close(fd)
+            raise
+        return (lambda: os.close(fd)), contended  # Closing the descriptor drops the lock
+
+    @staticmethod
+    @contextlib.contextmanager
+    def hold(filename, shared=False):
+        held = FileLock._local.__dict__.setdefault('held', set())
+        path = FileLock.lock_path(filename)
+        if path in held:
+            yield
+            return
+
+        start = time.perf_counter()
+        release, contended = FileLock._acquire(path, shared)
+        waited = time.perf_counter() - start
+        with FileLock._stats_lock:
+            waits = FileLock._waits.setdefault(os.path.basename(filename), [0, 0, 0.0, 0.0])
+            waits[0] += 1
+            waits[1] += contended
+            waits[2] += waited
+            waits[3] = max(waits[3], waited)
+
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            release()
+
+    @staticmethod
+    def stats():
+        """ Per-table acquisitions, how many had to wait, and the mean and longest wait in ms """
+        with FileLock._stats_lock:
+            return {table: {'acquired': acquired, 'contended': contended,
+                            'mean_wait_ms': total / acquired * 1000 if acquired else 0.0,
+                            'max_wait_ms': longest * 1000}
+                    for table, (acquired, contended, total, longest) in FileLock._waits.items()}
+
+    @staticmethod
+    def reset_stats():
+        with FileLock._stats_lock:
+            FileLock._waits.clear()
+
+
+# Write-Ahead Change Log
+class ChangeLog:
+    """Append-only log of keyed row changes layered over a CSV file.
+
+    Each line is a JSON record {"op": "insert"|"update"|"delete", "row": [...]}
+    keyed by the file's KEY_COLUMNS. CSVHandler.iter_rows replays the log on
+    top of the CSV, so a single-row edit costs one small append plus an
+    fsync instead of a full rewrite. Once the log passes COMPACT_BYTES it is
+    folded back into the CSV by a background thread. Replay is idempotent,
+    so a crash between the CSV replace and the log removal is harmless.
+    """
+    KEY_COLUMNS = {'students.csv': (2, 3), 'login.csv': (0,)}
+    COMPACT_BYTES = 256 * 1024
+    SUFFIX = '.log'
+
+    _lock = threading.RLock()
+    _compacting = set()
+
+    @staticmethod
+    def log_path(filename):
+        return CSVHandler.get_file_path(filename) + ChangeLog.SUFFIX
+
+    @staticmethod
+    def _key(filename, row):
+        columns = ChangeLog.KEY_COLUMNS.get(os.path.basename(filename))
+        return tuple(row[c] if c < len(row) else '' for c in columns)
+
+    @staticmethod
+    def has_pending(filename):
+        try:
+            return os.path.getsize(ChangeLog.log_path(filename)) > 0
+        except OSError:
+            return False
+
+    @staticmethod
+    def append(filename, changes):
+        """Durably log (op, row) changes for a keyed file in one write."""
+        if os.path.basename(filename) not in ChangeLog.KEY_COLUMNS:
+            raise ValueError(f"{filename} has no key columns for the change log.")
+        lines = ''.join(json.dumps({'op': op, 'row': list(row)}) + '\n' for op, row in changes)
+        with FileLock.hold(filename), ChangeLog._lock:
+            with open(ChangeLog.log_path(filename), mode='a', encoding='utf-8') as log:
+                log.write(lines)
+                log.flush()
+                os.fsync(log.fileno())
+            size = os.path.getsize(ChangeLog.log_path(filename))
+        if size >= ChangeLog.COMPACT_BYTES:
+            ChangeLog.compact_in_background(filename)
+
+    @staticmethod
+    def pending(filename):
+        """Return {key: row or None (deleted)} for the logged changes."""
+        changes = {}
+        try:
+            with open(ChangeLog.log_path(filename), mode='r', encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line from an interrupted write
+                    row = record['row']
+                    changes[ChangeLog._key(filename, row)] = None if record['op'] == 'delete' else row
+        except FileNotFoundError:
+            pass
+        return changes
+
+    @staticmethod
+    def replay(filename, rows, changes=None):
+        """Yield rows with logged updates/deletes applied and inserts at the end."""
+        if os.path.basename(filename) not in ChangeLog.KEY_COLUMNS:
+            yield from rows
+            return
+        if changes is None:
+            changes = ChangeLog.pending(filename)
+        if not changes:
+            yield from rows
+            return
+
+        emitted = set()
+        for row in rows:
+            key = ChangeLog._key(filename, row)
+            if key not in changes:
+                yield row
+            elif changes[key] is not None and key not in emitted:
+                emitted.add(key)
+                yield list(changes[key])
+        for key, row in changes.items():
+            if row is not None and key not in emitted:
+                yield list(row)
+
+    @staticmethod
+    def compact(filename):
+        """Fold the log into the CSV with an atomic replace, then drop the log."""
+        with FileLock.hold(filename), ChangeLog._lock:
+            if ChangeLog.has_pending(filename):
+                CSVHandler._rewrite_file(filename, CSVHandler._iter_file_rows(filename))
+
+    @staticmethod
+    def compact_in_background(filename):
+        with ChangeLog._lock:
+            if filename in ChangeLog._compacting:
+                return
+            ChangeLog._compacting.add(filename)
+
+        def run():
+            try:
+                ChangeLog.compact(filename)
+            except OSError as e:
+                print(f"[!] Compaction of {filename} failed: {e}")
+            finally:
+                with ChangeLog._lock:
+                    ChangeLog._compacting.discard(filename)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+# Offset Index
+class OffsetIndex:
+    """Sidecar <file>.idx of row byte offsets, so one student's rows can be read without loading the table.
+
+    For each indexed column the sidecar holds the CRC32 of every row's value
+    and the row's byte offset, sorted by (hash, offset). A lookup binary
+    searches the memory-mapped sidecar, then parses only the rows at the
+    matching offsets from the memory-mapped CSV, dropping hash collisions,
+    and applies the pending ChangeLog on top as replay() would. Rows
+    appended since the sidecar was written are parsed from where it stops
+    and kept in memory until there are TAIL_ROWS of them, then merged into
+    a new sidecar. A replaced CSV (compaction gives it a new inode) or one
+    whose covered bytes no longer match is indexed again from the start.
+    """
+    COLUMNS = {'students.csv': {'email': 2, 'course_id': 3}}
+    MIN_BYTES = 1 << 20  # Smaller tables are cheaper to load whole
+    TAIL_ROWS = 4096
+    SUFFIX = '.idx'
+    MAGIC = b'CMGIDX1' + (b'L' if sys.byteorder == 'little' else b'B')
+    HEADER = struct.Struct('<8sQQQQ')  # magic, inode, covered bytes, CRC of the bytes before covered, rows
+    CHECK_BYTES = 64
+    OFFSET_BITS = 40  # Sort key is hash << OFFSET_BITS | offset
+
+    _open = {}  # CSV path -> OffsetIndex
+    _open_lock = threading.Lock()
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.path = CSVHandler.get_file_path(filename)
+        self.index_path = self.path + OffsetIndex.SUFFIX
+        self.columns = OffsetIndex.COLUMNS[os.path.basename(filename)]
+        self.inode = None
+        self.covered = 0  # Bytes of the CSV the sidecar indexes
+        self.sections = {}  # column -> (hashes, offsets) memoryviews over the sidecar
+        self.tail = {}  # column -> unsorted sort keys of the rows past covered
+        self.tail_rows = 0
+        self.tail_end = 0  # Bytes of the CSV indexed in all
+        self.changes = (None, {})  # (log signature, ChangeLog.pending) from the last lookup
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def for_file(filename):
+        """ The shared index of a CSV table big enough to be worth one, else None """
+        if CSVHandler.backend is not None or os.path.basename(filename) not in OffsetIndex.COLUMNS:
+            return None
+        path = CSVHandler.get_file_path(filename)
+        try:
+            if os.path.getsize(path) < OffsetIndex.MIN_BYTES:
+                return None
+        except OSError:
+            return None
+        with OffsetIndex._open_lock:
+            if path not in OffsetIndex._open:
+                OffsetIndex._open[path] = OffsetIndex(filename)
+            return OffsetIndex._open[path]
+
+    @staticmethod
+    def _hash(value):
+        return zlib.crc32(value.encode('utf-8'))
+
+    @staticmethod
+    def _lines(data, start, end):
+        """ Yield the decoded lines of data[start:end], recording where each starts """
+        position = start
+        while position < end:
+            stop = data.find(b'\n', position, end)
+            stop = end if stop < 0 else stop + 1
+            yield position, data[position:stop].decode('utf-8')
+            position = stop
+
+    def _scan(self, data, start, end):
+        """ Yield (offset, row with unstripped cells) for the data rows in data[start:end] """
+        header = RecordStore.HEADERS.get(os.path.basename(self.filename))
+        if data.find(b'"', start, end) < 0:
+            # Nothing is quoted, so every non-blank line is one row split on commas
+            offset = start
+            for line in data[start:end].split(b'\n'):
+                if line.strip():
+                    row = line.decode('utf-8').split(',')
+                    if offset or row[0].strip().lstrip('\ufeff').lower() != header:
+                        yield offset, row
+                offset += len(line) + 1
+            return
+
+        starts = []
+
+        def lines():
+            for position, line in OffsetIndex._lines(data, start, end):
+                starts.append(position)
+                yield line
+
+        reader = csv.reader(lines())
+        while True:
+            first_line = reader.line_num
+            row = next(reader, None)
+            if row is None:
+                return
+            if starts[first_line] == 0 and row and row[0].strip().lstrip('\ufeff').lower() == header:
+                continue
+            yield starts[first_line], row
+
+    @staticmethod
+    def _row_at(data, offset, end):
+        """ Parse the one row that starts at offset """
+        row = next(csv.reader(line for _, line in OffsetIndex._lines(data, offset, end)), None)
+        return None if row is None else [cell.strip() for cell in row]
+
+    def _check(self, data, covered):
+        return zlib.crc32(data[max(0, covered - OffsetIndex.CHECK_BYTES):covered])
+
+    def _map_sidecar(self, data, stat):
+        """ Adopt the sidecar on disk if it indexes a prefix of this CSV; returns whether it did """
+        self.sections, self.inode, self.covered = {}, stat.st_ino, 0
+        try:
+            with open(self.index_path, 'rb') as file:
+                sidecar = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        if len(sidecar) < OffsetIndex.HEADER.size:
+            return False
+        magic, inode, covered, check, count = OffsetIndex.HEADER.unpack_from(sidecar)
+        if magic != OffsetIndex.MAGIC or inode != stat.st_ino or covered > stat.st_size or \
+                check != self._check(data, covered):
+            return False
+
+        view = memoryview(sidecar)
+        position = OffsetIndex.HEADER.size
+        for column in self.columns:
+            hashes = view[position:position + 4 * count].cast('I')
+            position += 4 * count + (-4 * count) % 8
+            offsets = view[position:position + 8 * count].cast('Q')
+            position += 8 * count
+            self.sections[column] = (hashes, offsets)
+        self.covered = covered
+        return True
+
+    def _write_sidecar(self, data, stat):
+        """ Merge the in-memory tail into a new sidecar covering everything indexed so far """
+        mask = (1 << OffsetIndex.OFFSET_BITS) - 1
+        sections = {}
+        for column in self.columns:
+            hashes, offsets = self.sections.get(column, ((), ()))
+            keys = [h << OffsetIndex.OFFSET_BITS | o for h, o in zip(hashes, offsets)]
+            keys.extend(self.tail[column])
+            keys.sort()
+            sections[column] = (array.array('I', [key >> OffsetIndex.OFFSET_BITS for key in keys]),
+                                array.array('Q', [key & mask for key in keys]))
+        self.sections = {}  # Let go of the old mapping before replacing its file
+
+        count = len(sections[next(iter(self.columns))][0])
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(OffsetIndex.HEADER.pack(OffsetIndex.MAGIC, stat.st_ino, self.tail_end,
+                                                   self._check(data, self.tail_end), count))
+                for column in self.columns:
+                    hashes, offsets = sections[column]
+                    file.write(hashes.tobytes() + bytes((-4 * count) % 8))
+                    file.write(offsets.tobytes())
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            # Keep serving from memory; the next process indexes the file itself
+            print(f"[!] Could not write {self.index_path}: {e}")
+            self.sections = {column: (memoryview(hashes), memoryview(offsets))
+                             for column, (hashes, offsets) in sections.items()}
+            self.covered = self.tail_end
+        else:
+            self._map_sidecar(data, stat)
+        self.tail = {column: [] for column in self.columns}
+        self.tail_rows = 0
+
+    def _refresh(self, data, stat):
+        """ Bring the index up to the CSV's first stat.st_size bytes """
+        if self.inode != stat.st_ino or self.tail_end > stat.st_size:
+            if not self._map_sidecar(data, stat):
+                self.sections = {}
+            self.tail = {column: [] for column in self.columns}
+            self.tail_rows = 0
+            self.tail_end = self.covered
+        if self.tail_end < stat.st_size:
+            # Only the appended bytes are parsed
+            columns = [(position, self.tail[column]) for column, position in self.columns.items()]
+            crc32, shift = zlib.crc32, OffsetIndex.OFFSET_BITS
+            for offset, row in self._scan(data, self.tail_end, stat.st_size):
+                for position, keys in columns:
+                    if len(row) > position:
+                        keys.append(crc32(row[position].strip().encode('utf-8')) << shift | offset)
+                self.tail_rows += 1
+            self.tail_end = stat.st_size
+        if self.tail_rows >= OffsetIndex.TAIL_ROWS or (self.tail_rows and not self.sections):
+            self._write_sidecar(data, stat)
+
+    def _offsets(self, column, value):
+        """ Offsets of the rows whose value hashes like value, in file order """
+        hashed = OffsetIndex._hash(value)
+        offsets = []
+        if column in self.sections:
+            hashes, positions = self.sections[column]
+            low = bisect.bisect_left(hashes, hashed)
+            offsets = positions[low:bisect.bisect_right(hashes, hashed, low)].tolist()
+        mask = (1 << OffsetIndex.OFFSET_BITS) - 1
+        offsets.extend(key & mask for key in self.tail[column] if key >> OffsetIndex.OFFSET_BITS == hashed)
+        offsets.sort()
+        return offsets
+
+    def _pending(self):
+        """ ChangeLog.pending, parsed again only when the log file has changed """
+        try:
+            stat = os.stat(ChangeLog.log_path(self.filename))
+        except OSError:
+            return {}
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self.changes[0] != signature:
+            self.changes = (signature, ChangeLog.pending(self.filename))
+        return self.changes[1]
+
+    def find(self, column, value):
+        """ Return the current rows whose column equals value, in file order, with logged changes applied """
+        position = self.columns[column]
+        with FileLock.hold(self.filename, shared=True):
+            try:
+                file = open(self.path, mode='rb')
+            except FileNotFoundError:
+                return []
+            stat = os.fstat(file.fileno())
+            changes = self._pending()
+
+        with file:
+            if stat.st_size == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with self._lock:
+                    self._refresh(data, stat)
+                    offsets = self._offsets(column, value)
+                rows = []
+                for offset in offsets:
+                    row = OffsetIndex._row_at(data, offset, stat.st_size)
+                    if row is not None and len(row) > position and row[position] == value:
+                        rows.append(row)  # Anything else was a hash collision
+
+        if not changes:
+            return rows
+        current, emitted = [], set()
+        for row in rows:
+            key = ChangeLog._key(self.filename, row)
+            if key not in changes:
+                current.append(row)
+            elif changes[key] is not None and key not in emitted:
+                emitted.add(key)
+                current.append(list(changes[key]))
+        for key, row in changes.items():
+            if row is not None and key not in emitted and len(row) > position and row[position] == value:
+                current.append(list(row))
+        return current
+
+
+# SQLite Storage Backend
+class SQLiteBackend:
+    """Keeps the four tables in one SQLite database behind the CSVHandler calls.
+
+    Each CSV filename maps to a table with the same columns (stored as TEXT)
+    plus indexes on the email and course_id lookup columns. Rows come back
+    header first, exactly like the CSV files.
+    """
+    TABLES = {
+        'students.csv': ('students', ['first_name', 'last_name', 'email', 'course_id', 'grade', 'marks']),
+        'courses.csv': ('courses', ['course_id', 'course_name', 'description', 'professor_email']),
+        'professors.csv': ('professors', ['name', 'email', 'rank', 'course_id']),
+        'login.csv': ('login', ['email', 'password', 'role']),
+    }
+    KEY_COLUMNS = {'students.csv': ('email', 'course_id'), 'login.csv': ('email',)}
+    INDEXED_COLUMNS = ('email', 'course_id')
+    FETCH_SIZE = 1000
+
+    def __init__(self, db_path='checkmygrade.db'):
+        global sqlite3
+        import sqlite3
+        self.db_path = CSVHandler.get_file_path(db_path)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            for table, columns in self.TABLES.values():
+                column_defs = ', '.join(f"{column} TEXT" for column in columns)
+                self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {column_defs})")
+                for column in self.INDEXED_COLUMNS:
+                    if column in columns:
+                        self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+
+    def _table(self, filename):
+        return self.TABLES[os.path.basename(filename)]
+
+    @staticmethod
+    def _fit(row, columns):
+        row = list(row[:len(columns)])
+        return row + [''] * (len(columns) - len(row))
+
+    def exists(self, filename):
+        return os.path.basename(filename) in self.TABLES
+
+    def signature(self, filename):
+        # data_version only moves when another connection commits
+        with self.lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def iter_rows(self, filename):
+        table, columns = self._table(filename)
+        yield list(columns)  # header
+        # Page by id so no cursor stays open between yields
+        last_id = 0
+        while True:
+            with self.lock:
+                batch = self.connection.execute(
+                    f"SELECT id, {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, self.FETCH_SIZE)).fetchall()
+            if not batch:
+                return
+            for row in batch:
+                yield [value if value is not None else '' for value in row[1:]]
+            last_id = batch[-1][0]
+
+    def write_rows(self, filename, rows, mode='a'):
+        table, columns = self._table(filename)
+        rows = list(rows)
+        if rows and rows[0] and str(rows[0][0]).lstrip('\ufeff').lower() == columns[0]:
+            rows = rows[1:]  # header row
+        placeholders = ', '.join('?' * len(columns))
+        with self.lock, self.connection:
+            if mode == 'w':
+                self.connection.execute(f"DELETE FROM {table}")
+            self.connection.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                                        [self._fit(row, columns) for row in rows])
+
+    def apply_changes(self, filename, changes):
+        """Apply keyed changes in one transaction; inserts and updates are upserts."""
+        table, columns = self._table(filename)
+        key_columns = self.KEY_COLUMNS[os.path.basename(filename)]
+        where = ' AND '.join(f"{column} = ?" for column in key_columns)
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        placeholders = ', '.join('?' * len(columns))
+        with self.lock, self.connection:
+            for op, row in changes:
+                row = self._fit(row, columns)
+                key = [row[columns.index(column)] for column in key_columns]
+                if op == 'delete':
+                    self.connection.execute(f"DELETE FROM {table} WHERE {where}", key)
+                elif self.connection.execute(f"UPDATE {table} SET {assignments} WHERE {where}", row + key).rowcount == 0:
+                    self.connection.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", row)
+
+    def migrate_from_csv(self):
+        """Copy every CSV file (with its change log applied) into the database."""
+        counts = {}
+        for filename in self.TABLES:
+            rows = list(CSVHandler._iter_file_rows(filename))
+            self.write_rows(filename, rows, mode='w')
+            with self.lock:
+                counts[filename] = self.connection.execute(
+                    f"SELECT COUNT(*) FROM {self._table(filename)[0]}").fetchone()[0]
+        return counts
+
+
+# Indexed Record Store
+class RecordStore:
+    """Loads each CSV file once and keeps hash indexes on its lookup columns.
+
+    A loaded table is revalidated against the file signature (mtime, size
+    and inode of the CSV and its change log) on every access and re-parsed
+    only when another writer changed it. Writes made through CSVHandler
+    refresh the signature, since the store is updated alongside them.
+    Cells of the SHARED_COLUMNS are interned, so a value repeated on many
+    rows (a student's name and email, a course id, a grade) is held once.
+    """
+
+    # Indexed columns per file: column name -> position in the row
+    INDEXES = {
+        'students.csv': {'email': 2, 'course_id': 3},
+        'professors.csv': {'email': 1},
+        'courses.csv': {'course_id': 0},
+        'login.csv': {'email': 0},
+    }
+    # Positions whose values repeat across rows; unique ones (hashes) would only grow the intern table
+    SHARED_COLUMNS = {
+        'students.csv': (0, 1, 2, 3, 4, 5),
+        'professors.csv': (2, 3),
+        'login.csv': (2,),
+    }
+    # First column name of the header row, used to tell headers from data
+    HEADERS = {
+        'students.csv': 'first_name',
+        'professors.csv': 'name',
+        'courses.csv': 'course_id',
+        'login.csv': 'email',
+    }
+
+    def __init__(self):
+        self.tables = {}   # filename -> list of data rows
+        self.headers = {}  # filename -> header row (or None)
+        self.indexes = {}  # filename -> {column: {value: [rows]}}
+        self.listeners = []  # objects told about row changes (see subscribe)
+        self.signatures = {}  # filename -> CSVHandler.signature() when loaded
+        self.versions = {}  # filename -> counter bumped on every change
+        self.hits = 0
+        self.misses = 0
+
+    def subscribe(self, listener):
+        """Register an object with rows_added/rows_removed/reset(filename, ...) hooks."""
+        self.listeners.append(listener)
+
+    def _notify(self, hook, filename, *args):
+        for listener in self.listeners:
+            getattr(listener, hook)(filename, *args)
+
+    def _bump(self, filename):
+        self.versions[filename] = self.versions.get(filename, 0) + 1
+
+    def _load(self, filename):
+        self.signatures[filename] = CSVHandler.signature(filename)
+        rows = CSVHandler.read_csv(filename)
+        header = None
+        if rows and rows[0] and rows[0][0].lstrip('\ufeff').lower() == self.HEADERS.get(os.path.basename(filename)):
+            header = rows.pop(0)
+        self.headers[filename] = header
+        self._share(filename, rows)
+        self.tables[filename] = rows
+        self.indexes[filename] = {column: {} for column in self.INDEXES.get(os.path.basename(filename), {})}
+        self._index_rows(filename, rows)
+        self._bump(filename)
+
+    def _share(self, filename, rows):
+        positions = self.SHARED_COLUMNS.get(os.path.basename(filename), ())
+        intern = sys.intern
+        for row in rows:
+            for position in positions:
+                if position < len(row):
+                    row[position] = intern(row[position])
+
+    def _index_rows(self, filename, rows):
+        for column, position in self.INDEXES.get(os.path.basename(filename), {}).items():
+            index = self.indexes[filename][column]
+            for row in rows:
+                if len(row) > position:
+                    index.setdefault(row[position], []).append(row)
+
+    def rows(self, filename):
+        """Return every data row of a file, parsing it only when it is new or changed."""
+        if filename in self.tables and self.signatures.get(filename) == CSVHandler.signature(filename):
+            self.hits += 1
+        else:
+            self.misses += 1
+            if filename in self.tables:
+                self.invalidate(filename)
+            self._load(filename)
+        return self.tables[filename]
+
+    def version(self, filename):
+        """Return a counter that changes whenever the table's contents change."""
+        self.rows(filename)
+        return self.versions[filename]
+
+    def touch(self, filename):
+        """Accept the file's current signature after a write the store already reflects."""
+        if filename in self.tables:
+            self.signatures[filename] = CSVHandler.signature(filename)
+
+    def cache_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'loaded': list(self.tables)}
+
+    def index(self, filename, column):
+        """Return the live {value: [rows]} index of a column, revalidated once; treat it as read-only."""
+        self.rows(filename)
+        return self.indexes[filename][column]
+
+    def lookup(self, filename, column, value):
+        """Return the rows whose indexed column equals value."""
+        self.rows(filename)
+        return list(self.indexes[filename][column].get(value, []))
+
+    def loaded(self, filename):
+        """Return True if the table is in memory and still matches the file."""
+        return filename in self.tables and self.signatures.get(filename) == CSVHandler.signature(filename)
+
+    def find(self, filename, column, value):
+        """Like lookup, but a large table that is not loaded (or is stale) stays unloaded.
+
+        The matching rows are read through the table's OffsetIndex instead.
+        """
+        if not self.loaded(filename):
+            index = OffsetIndex.for_file(filename)
+            if index is not None and column in index.columns:
+                return index.find(column, value)
+        return self.lookup(filename, column, value)
+
+    def append(self, filename, rows):
+        """Add rows that were just appended to the file."""
+        if filename not in self.tables:
+            return  # Not loaded yet; the next load picks them up
+        self._share(filename, rows)
+        self.tables[filename].extend(rows)
+        self._index_rows(filename, rows)
+        self._bump(filename)
+        self._notify('rows_added', filename, rows)
+
+    def remove(self, filename, column, value):
+        """Drop the rows whose indexed column equals value and return them."""
+        return self.remove_rows(filename, self.lookup(filename, column, value))
+
+    def remove_rows(self, filename, rows):
+        """Drop loaded rows (matched by identity) in one pass over the table and return them.
+
+        Only the index buckets the rows were in are rebuilt.
+        """
+        removed_ids = {id(row) for row in rows}
+        if not removed_ids or filename not in self.tables:
+            return []
+        removed = [row for row in self.tables[filename] if id(row) in removed_ids]
+        self.tables[filename] = [row for row in self.tables[filename] if id(row) not in removed_ids]
+        for column, position in self.INDEXES.get(os.path.basename(filename), {}).items():
+            index = self.indexes[filename][column]
+            for value in {row[position] for row in removed if len(row) > position}:
+                kept = [row for row in index.get(value, ()) if id(row) not in removed_ids]
+                if kept:
+                    index[value] = kept
+                else:
+                    index.pop(value, None)
+        if removed:
+            self._bump(filename)
+            self._notify('rows_removed', filename, removed)
+        return removed
+
+    def update(self, filename, row, values):
+        """Change cells of a loaded row in place; values maps position -> new value.
+
+        Indexed columns must not be changed this way.
+        """
+        old_row = list(row)
+        shared = self.SHARED_COLUMNS.get(os.path.basename(filename), ())
+        for position, value in values.items():
+            row[position] = sys.intern(value) if position in shared else value
+        self._bump(filename)
+        self._notify('rows_removed', filename, [old_row])
+        self._notify('rows_added', filename, [row])
+
+    def invalidate(self, filename=None):
+        """Forget a loaded file (or all of them) so the next access re-reads it."""
+        for cache in (self.tables, self.headers, self.indexes, self.signatures):
+            if filename is None:
+                cache.clear()
+            else:
+                cache.pop(filename, None)
+        self._notify('reset', filename)
+
+
+# Shared record store used by the application classes
+record_store = RecordStore()
+
+
+# Batched Persistence of Student Edits
+class UnitOfWork:
+    """Tracks modified students.csv rows and flushes them in one batch.
+
+    Repeated edits of the same email+course_id coalesce into one record.
+    Dirty rows are written to the change log as a single append when
+    flush_count rows are pending, flush_interval seconds after the first
+    edit, on logout, or at interpreter exit.
+    """
+    def __init__(self, flush_count=500, flush_interval=30.0):
+        self.flush_count = flush_count
+        self.flush_interval = flush_interval
+        self.dirty = {}  # (email, course_id) -> row in the record store
+        self.lock = threading.RLock()
+        self.timer = None
+
+    def register_dirty(self, row):
+        with self.lock:
+            self.dirty[(row[2], row[3])] = row
+            if len(self.dirty) >= self.flush_count:
+                self.flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Write every pending edit in one change-log append; return how many."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            rows, self.dirty = list(self.dirty.values()), {}
+            if rows:
+                CSVHandler.apply_changes('students.csv', [('update', list(row)) for row in rows])
+        return len(rows)
+
+    # Record store hooks
+    def rows_added(self, filename, rows):
+        pass
+
+    def rows_removed(self, filename, rows):
+        # A deleted row must not be written back by a later flush
+        if filename == 'students.csv':
+            with self.lock:
+                for row in rows:
+                    if self.dirty.get((row[2], row[3])) is row:
+                        del self.dirty[(row[2], row[3])]
+
+    def reset(self, filename):
+        if filename in (None, 'students.csv'):
+            self.flush()
+
+
+# Shared unit of work for student record edits
+student_changes = UnitOfWork()
+record_store.subscribe(student_changes)
+atexit.register(student_changes.flush)
+
+
+# Compact Enrollment Storage
+class EnrollmentTable:
+    """Enrollments of many students held in parallel arrays instead of dicts.
+
+    Enrollment i has a course code course_of[i], a grade code grade_of[i]
+    and marks[i]. Course ids and grades are interned once in code tables,
+    and marks are packed as 16-bit integers; marks text that would not
+    round-trip (e.g. "abc" or "085") is kept in odd_marks instead. A
+    student's enrollments are chained through next_of from first[student]
+    to last[student], so adding one is O(1) in any order.
+    """
+    ODD_MARKS = -1  # Stored in marks when the real text is in odd_marks
+
+    def __init__(self):
+        self.course_ids, self.course_codes = [], {}
+        self.grades, self.grade_codes = [], {}
+        self.course_of = array.array('I')
+        self.grade_of = array.array('H')
+        self.marks = array.array('h')
+        self.next_of = array.array('i')
+        self.first = array.array('i')
+        self.last = array.array('i')
+        self.odd_marks = {}  # enrollment -> marks text
+
+    def __len__(self):
+        return len(self.marks)
+
+    @staticmethod
+    def _code(value, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(sys.intern(value))
+        return code
+
+    def _pack_marks(self, position, marks):
+        marks = str(marks)
+        if marks.isdecimal() and len(marks) < 5 and str(int(marks)) == marks:
+            self.odd_marks.pop(position, None)
+            return int(marks)
+        self.odd_marks[position] = marks
+        return self.ODD_MARKS
+
+    def add_student(self):
+        """ Reserve the next student index """
+        self.first.append(-1)
+        self.last.append(-1)
+        return len(self.first) - 1
+
+    def add(self, student, course_id, grade, marks):
+        position = len(self.marks)
+        self.course_of.append(self._code(course_id, self.course_ids, self.course_codes))
+        self.grade_of.append(self._code(grade, self.grades, self.grade_codes))
+        self.marks.append(self._pack_marks(position, marks))
+        self.next_of.append(-1)
+        if self.last[student] < 0:
+            self.first[student] = position
+        else:
+            self.next_of[self.last[student]] = position
+        self.last[student] = position
+        return position
+
+    def positions(self, student):
+        position = self.first[student]
+        while position >= 0:
+            yield position
+            position = self.next_of[position]
+
+    def find(self, student, course_id):
+        """ Return the position of the student's enrollment in course_id, or -1 """
+        code = self.course_codes.get(course_id)
+        for position in self.positions(student):
+            if self.course_of[position] == code:
+                return position
+        return -1
+
+    def marks_text(self, position):
+        marks = self.marks[position]
+        return self.odd_marks[position] if marks == self.ODD_MARKS else str(marks)
+
+    def enrollments(self, student):
+        """ Yield (course_id, grade, marks) for one student in the order they were added """
+        for position in self.positions(student):
+            yield (self.course_ids[self.course_of[position]], self.grades[self.grade_of[position]],
+                   self.marks_text(position))
+
+    def update(self, position, grade, marks):
+        self.grade_of[position] = self._code(grade, self.grades, self.grade_codes)
+        self.marks[position] = self._pack_marks(position, marks)
+
+    def remove(self, student, course_id):
+        """ Unlink the student's enrollment in course_id; returns False if there was none.
+
+        The slot itself is not reused; the table is rebuilt on the next full load.
+        """
+        code = self.course_codes.get(course_id)
+        previous = -1
+        for position in self.positions(student):
+            if self.course_of[position] == code:
+                following = self.next_of[position]
+                if previous < 0:
+                    self.first[student] = following
+                else:
+                    self.next_of[previous] = following
+                if self.last[student] == position:
+                    self.last[student] = previous
+                self.odd_marks.pop(position, None)
+                return True
+            previous = position
+        return False
+
+    def is_empty(self, student):
+        return self.first[student] < 0
 
 
 # Student Class
 class Student:
-    def __init__(self, first_name, last_name, email, course_id=None, grade=None, marks=None):
-        self.first_name = first_name
-        self.last_name = last_name
+    # Slotted, and the enrollments live in an EnrollmentTable shared by every
+    # Student loaded together; courses is a dict view built when asked for
+    __slots__ = ('first_name', 'last_name', 'email', 'table', 'index')
+
+    def __init__(self, first_name, last_name, email, course_id=None, grade=None, marks=None, table=None):
+        self.first_name = sys.intern(first_name)
+        self.last_name = sys.intern(last_name)
         self.email = email
-        self.courses = {}  # Dictionary to store courses and grades
+        self.table = EnrollmentTable() if table is None else table
+        self.index = self.table.add_student()
         if course_id and grade and marks:
             self.add_course(course_id, grade, marks)
 
+    @property
+    def courses(self):
+        """ {course_id: {'grade': ..., 'marks': ...}} for this student """
+        return {course_id: {'grade': grade, 'marks': marks}
+                for course_id, grade, marks in self.table.enrollments(self.index)}
+
     def add_course(self, course_id, grade, marks):
-        if course_id not in self.courses:
-            self.courses[course_id] = {'grade': grade, 'marks': marks}
+        if self.table.find(self.index, course_id) < 0:
+            self.table.add(self.index, course_id, grade, marks)
         else:
             print(f"Course {course_id} already exists for {self.first_name} {self.last_name}.")
 
     @staticmethod
     def load_students():
-        file_path = CSVHandler.get_file_path('students.csv')
-        students_data = CSVHandler.read_csv('students.csv')
+        students_data = record_store.rows('students.csv')
         students = {}
+        table = EnrollmentTable()
 
         for data in students_data:
             first_name, last_name, email, course_id, grade, marks = data
 
             if email not in students:
-                students[email] = Student(first_name, last_name, email)
+                students[email] = Student(first_name, last_name, email, table=table)
 
             students[email].add_course(course_id, grade, marks)
         return list(students.values())
@@ -83,44 +1345,38 @@ class Student:
         if not isinstance(user, Student):
             print("[!] This functionality is available only for students.")
             return 
-        student_found = False
-        for student in Student.load_students():
-            if student.email == user.email:
-                student_found = True
-                if not student.courses:
-                    print(f"No courses found for {student.first_name} {student.last_name}.")
-                else:
-                    print("\n--- Your Grades ---")
-                    print(f"Student: {student.first_name} {student.last_name} ({student.email})")
-                    print("Courses and Grades:")
-                    for course_id, details in student.courses.items():
-                        print(f"{course_id}: Grade - {details['grade']}, Marks - {details['marks']}")
-                break
-
-        if not student_found:
-            print("[!] Student not found.")
+        result = GradeService.student_grades(user.email)
+        if not result.ok:
+            result.show()
             return
 
+        records = result.data
+        print("\n--- Your Grades ---")
+        print(f"Student: {records[0].first_name} {records[0].last_name} ({user.email})")
+        print("Courses and Grades:")
+        for record in records:
+            print(f"{record.course_id}: Grade - {record.grade}, Marks - {record.marks}")
+
     def update_student_record(self, course_id, new_grade, new_marks):
-        # Check if the student is enrolled in the course
-        if course_id in self.courses:
-            self.courses[course_id]['grade'] = new_grade
-            self.courses[course_id]['marks'] = new_marks
-            print(f"Updated record for {self.first_name} {self.last_name} in course {course_id}.")
-        else:
-            print(f"Student is not enrolled in the course: {course_id}.")
+        result = GradeService.update_student(self.email, course_id, new_grade, new_marks)
+        position = self.table.find(self.index, course_id)
+        if result.ok and position >= 0:
+            self.table.update(position, new_grade, new_marks)
+        result.show()
 
     def display_records(self):
         print(f"Student: {self.first_name} {self.last_name} ({self.email})")
         print("Courses and Grades:")
-        for course, details in self.courses.items():
-            print(f"{course}: Grade - {details['Grade']}, Marks - {details['Marks']}")
+        for course, grade, marks in self.table.enrollments(self.index):
+            print(f"{course}: Grade - {grade}, Marks - {marks}")
 
 # Course Class
 class Course:
+    __slots__ = ('professor_email', 'course_id', 'course_name', 'description')
+
     def __init__(self, course_id, course_name, description, professor_email=None):
         self.professor_email = professor_email
-        self.course_id = course_id
+        self.course_id = sys.intern(course_id)
         self.course_name = course_name
         self.description = description
 
@@ -129,9 +1385,7 @@ class Course:
 
     @staticmethod
     def load_courses():
-
-        file_path = CSVHandler.get_file_path('courses.csv')
-        courses_data = CSVHandler.read_csv('courses.csv')
+        courses_data = record_store.rows('courses.csv')
         courses = []
         for data in courses_data:
             courses.append(Course(*data))
@@ -150,22 +1404,30 @@ class Course:
         for course in course_list:
             data.append([course.course_id, course.course_name, course.description, course.professor_email])
         CSVHandler.write_csv('courses.csv', data)
+        record_store.invalidate('courses.csv')
 
 # Professor Class
 class Professor:
+    __slots__ = ('name', 'email', 'rank', 'course_id')
+
     def __init__(self, name, email, rank, course_id):
         self.name = name
         self.email = email
-        self.rank = rank
-        self.course_id = course_id
+        self.rank = sys.intern(rank)
+        self.course_id = sys.intern(course_id)
+
+    @property
+    def course_ids(self):
+        """ Every course this professor teaches; course_id is only the first of them """
+        return teaching_index.courses(self.email) or [self.course_id]
 
     def display_professor(self):
-        print(f"Professor: {self.name}, Email: {self.email}, Rank: {self.rank}, Course: {self.course_id}")
+        print(f"Professor: {self.name}, Email: {self.email}, Rank: {self.rank}, "
+              f"Courses: {', '.join(self.course_ids)}")
 
     @staticmethod
     def load_professors():
-        file_path = CSVHandler.get_file_path('professors.csv')
-        professors_data = CSVHandler.read_csv('professors.csv')
+        professors_data = record_store.rows('professors.csv')
         professors = []
         for data in professors_data:
             professors.append(Professor(*data))
@@ -177,102 +1439,835 @@ class Professor:
         for professor in professor_list:
             data.append([professor.name, professor.email, professor.rank, professor.course_id])
         CSVHandler.write_csv('professors.csv', data)
+        record_store.invalidate('professors.csv')
 
-    def get_students_by_course(self, course_id):
-        """ Retrieve students enrolled in a given course """
-        students_data = CSVHandler.read_csv('students.csv')
-        enrolled_students = []
-
-        for student_data in students_data:
-            first_name, last_name, email, course_id_student, grade, marks = student_data
-            if course_id_student == course_id:
-                enrolled_students.append(f"{first_name} {last_name} - {email}")
-
-        return enrolled_students
+    def get_students_by_course(self, course_id, offset=0, limit=None):
+        """ Retrieve students enrolled in a given course, sorted by name, optionally one page of them """
+        return [f"{record.first_name} {record.last_name} - {record.email}"
+                for record in GradeService.roster(course_id, offset, limit).data.records]
     
     @staticmethod
     def add_student_to_course(first_name, last_name, email, course_id, grade, marks):
         """ Add a new student record to the students.csv """
-        student_data = [first_name, last_name, email, course_id, grade, marks]
-        file_path = CSVHandler.get_file_path('students.csv')
-        CSVHandler.write_csv(file_path, [student_data], mode="a")  # Append new student to the file
+        GradeService.add_student(first_name, last_name, email, course_id, grade, marks).show()
 
-        print(f"[+] Student {first_name} {last_name} added successfully to course {course_id}.")
+    @staticmethod
+    def import_grades(source_path, batch_size=50000, workers=None):
+        """ Bulk-import a CSV or JSONL grade file and print the per-row rejects; see GradeService """
+        result = GradeService.import_grades(source_path, batch_size, workers)
+        if result.ok:
+            for row_number, reason in result.data['rejected']:
+                print(f"[!] Row {row_number} rejected: {reason}")
+        result.show()
+        return result.data
     
     @staticmethod
-    def delete_student_record(email, file_path="students.csv"):
-        """ Delete a student record by email from the students.csv file """
-        try:
-            students_data = CSVHandler.read_csv('students.csv')
-            updated_data = []
-
-            # Find the student record to delete and keep other records
-            student_found = False
-            for student in students_data:
-                if student[2] != email:  # student[2] is the email field
-                    updated_data.append(student)
-                else:
-                    student_found = True  # Mark that we found and removed the student
+    def delete_student_record(email, file_path="students.csv", course_id=None):
+        """ Delete a student record by email (only the one course if course_id is given) """
+        GradeService.delete_student(email, course_id).show()
 
-            # If student was found, update the CSV
-            if student_found:
-                CSVHandler.write_csv('students.csv', updated_data, mode='w')  # Overwrite the file with the updated data
-                print(f"[+] Student with email {email} has been deleted.")
+    @staticmethod
+    def delete_student_records(targets):
+        """ Delete many students or (email, course_id) enrollments at once and print what went """
+        result = GradeService.delete_students(targets)
+        if result.data is not None:
+            for target in result.data['not_found']:
+                print(f"[!] Not found: {target if isinstance(target, str) else ' in '.join(target)}")
+        result.show()
+        return result.data
+
+# Incremental Statistics
+class MarkAggregate:
+    """Running count and sum plus a Fenwick tree of mark frequencies.
+
+    Adding or removing a mark and reading the mean, min, max or median all
+    cost O(log capacity), where capacity is the highest mark seen.
+    """
+    def __init__(self, capacity=128):
+        self.count = 0
+        self.total = 0
+        self.capacity = capacity
+        self.tree = [0] * (capacity + 1)
+
+    def _update(self, mark, delta):
+        i = mark + 1
+        while i <= self.capacity:
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _grow(self, mark):
+        frequencies = [self._prefix(i + 1) - self._prefix(i) for i in range(self.capacity)]
+        while self.capacity <= mark:
+            self.capacity *= 2
+        self.tree = [0] * (self.capacity + 1)
+        for value, frequency in enumerate(frequencies):
+            if frequency:
+                self._update(value, frequency)
+
+    def add(self, mark):
+        if mark >= self.capacity:
+            self._grow(mark)
+        self._update(mark, 1)
+        self.count += 1
+        self.total += mark
+
+    def remove(self, mark):
+        self._update(mark, -1)
+        self.count -= 1
+        self.total -= mark
+
+    def kth(self, k):
+        """Return the k-th smallest mark (1-based)."""
+        pos = 0
+        step = 1 << self.capacity.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.capacity and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    def mean(self):
+        return self.total / self.count
+
+    def minimum(self):
+        return self.kth(1)
+
+    def maximum(self):
+        return self.kth(self.count)
+
+    def median(self):
+        middle = self.count // 2
+        if self.count % 2:
+            return self.kth(middle + 1)
+        return (self.kth(middle) + self.kth(middle + 1)) / 2
+
+
+class GradeStatistics:
+    """Mark aggregates for all students, per course and per professor.
+
+    Built from the record store on first use and then kept up to date from
+    its change notifications instead of re-reading students.csv.
+    """
+    def __init__(self):
+        self.overall = None
+        self.by_course = {}
+        self.by_professor = {}
+        self.course_professors = {}  # course_id -> professor emails
+
+    @staticmethod
+    def _parse_mark(row):
+        try:
+            mark = int(row[5])
+        except (IndexError, ValueError):
+            return None  # Skip rows with invalid marks
+        return mark if mark >= 0 else None
+
+    def _apply(self, row, add):
+        mark = self._parse_mark(row)
+        if mark is None:
+            return
+        course_id = row[3]
+        aggregates = [self.overall, self.by_course.setdefault(course_id, MarkAggregate())]
+        for email in self.course_professors.get(course_id, ()):
+            aggregates.append(self.by_professor.setdefault(email, MarkAggregate()))
+        for aggregate in aggregates:
+            if add:
+                aggregate.add(mark)
             else:
-                print(f"[!] Student with email {email} not found.")
-        except FileNotFoundError:
-            print(f"[!] The file 'students.csv' was not found.")
-        except Exception as e:
-            print(f"[!] An error occurred while deleting the student: {e}")
+                aggregate.remove(mark)
+
+    def _build(self):
+        # Read (and so revalidate) both tables before any aggregate exists, so a
+        # reload's reset() cannot clear them halfway through the build
+        professor_rows = record_store.rows('professors.csv')
+        student_rows = record_store.rows('students.csv')
+        self.by_course = {}
+        self.by_professor = {}
+        self.course_professors = {}
+        for row in professor_rows:
+            if len(row) > 3:
+                self.course_professors.setdefault(row[3], []).append(row[1])
+        self.overall = MarkAggregate()
+        for row in student_rows:
+            self._apply(row, add=True)
+
+    def aggregate(self, course_id=None, professor_email=None):
+        """Return the aggregate for a course, a professor or everyone."""
+        # A change to either file on disk resets the aggregates through the hooks
+        record_store.rows('professors.csv')
+        record_store.rows('students.csv')
+        if self.overall is None:
+            self._build()
+        if course_id:
+            return self.by_course.get(course_id)
+        if professor_email:
+            return self.by_professor.get(professor_email)
+        return self.overall
+
+    # Record store hooks
+    def rows_added(self, filename, rows):
+        if filename == 'professors.csv':
+            self.overall = None  # A new professor's courses need their marks counted again
+        elif filename == 'students.csv' and self.overall is not None:
+            for row in rows:
+                self._apply(row, add=True)
+
+    def rows_removed(self, filename, rows):
+        if filename == 'professors.csv':
+            self.overall = None
+        elif filename == 'students.csv' and self.overall is not None:
+            for row in rows:
+                self._apply(row, add=False)
+
+    def reset(self, filename):
+        if filename in (None, 'students.csv', 'professors.csv'):
+            self.overall = None
+
+
+# Shared statistics engine, kept current by the record store
+grade_statistics = GradeStatistics()
+record_store.subscribe(grade_statistics)
+
+
+# Professor Join Index
+class TeachingIndex:
+    """Join of professors.csv and students.csv: professor -> courses -> enrollments.
+
+    professors.csv has one row per professor and course, so a professor may
+    teach several courses. The professor -> course ids map is built from it
+    on first use, patched on appends and dropped when the file changes. Each
+    course's enrollments come from the record store's course_id index, which
+    every write already maintains, so listing a professor's grades touches
+    only that professor's enrollments.
+    """
+    def __init__(self):
+        self.courses_of = None  # professor email -> [course ids]
+
+    def _add(self, rows):
+        for row in rows:
+            if len(row) > 3:
+                courses = self.courses_of.setdefault(row[1], [])
+                if row[3] not in courses:
+                    courses.append(row[3])
+
+    def _map(self):
+        rows = record_store.rows('professors.csv')  # Revalidates first; a change resets the map
+        if self.courses_of is None:
+            self.courses_of = {}
+            self._add(rows)
+        return self.courses_of
+
+    def courses(self, professor_email):
+        """ Course ids taught by the professor, in professors.csv order """
+        return list(self._map().get(professor_email, ()))
+
+    def professors(self):
+        return list(self._map())
+
+    def enrollments(self, professor_email):
+        """ Yield the student rows of every course the professor teaches """
+        by_course = record_store.index('students.csv', 'course_id')
+        for course_id in self.courses(professor_email):
+            yield from by_course.get(course_id, ())
+
+    # Record store hooks
+    def rows_added(self, filename, rows):
+        if filename == 'professors.csv' and self.courses_of is not None:
+            self._add(rows)
+
+    def rows_removed(self, filename, rows):
+        if filename == 'professors.csv':
+            self.courses_of = None
+
+    def reset(self, filename):
+        if filename in (None, 'professors.csv'):
+            self.courses_of = None
+
+
+# Shared professor join index, kept current by the record store
+teaching_index = TeachingIndex()
+record_store.subscribe(teaching_index)
+
+
+# Course Roster Index
+class RosterIndex:
+    """Sorted rosters per course for paged listing, built from the course_id index.
+
+    A course's roster is sorted by last name, first name and email the first
+    time it is asked for and kept in step with appends by bisect insertion.
+    Any other change to a course's rows drops just that roster, which is
+    re-sorted from memory on the next request; the file is never re-parsed
+    to serve a page. Counting needs no roster at all.
+    """
+    def __init__(self):
+        self.rosters = {}  # course_id -> (sort keys, rows), in the same order
+
+    @staticmethod
+    def _key(row):
+        return (row[1].lower(), row[0].lower(), row[2])
+
+    def _roster(self, course_id):
+        by_course = record_store.index('students.csv', 'course_id')  # Revalidates; a change clears the rosters
+        if course_id not in self.rosters:
+            rows = sorted(by_course.get(course_id, ()), key=self._key)
+            self.rosters[course_id] = ([self._key(row) for row in rows], rows)
+        return self.rosters[course_id]
+
+    def count(self, course_id):
+        return len(record_store.index('students.csv', 'course_id').get(course_id, ()))
+
+    def page(self, course_id, offset=0, limit=None):
+        """ Rows offset .. offset + limit of the sorted roster (to the end when limit is None) """
+        _, rows = self._roster(course_id)
+        offset = max(offset, 0)
+        return rows[offset:] if limit is None else rows[offset:offset + max(limit, 0)]
+
+    # Record store hooks
+    def rows_added(self, filename, rows):
+        if filename != 'students.csv':
+            return
+        for row in rows:
+            roster = self.rosters.get(row[3]) if len(row) > 3 else None
+            if roster is not None:
+                keys, roster_rows = roster
+                key = self._key(row)
+                position = bisect.bisect_right(keys, key)
+                keys.insert(position, key)
+                roster_rows.insert(position, row)
+
+    def rows_removed(self, filename, rows):
+        if filename == 'students.csv':
+            for row in rows:
+                if len(row) > 3:
+                    self.rosters.pop(row[3], None)
+
+    def reset(self, filename):
+        if filename in (None, 'students.csv'):
+            self.rosters = {}
+
+
+# Shared roster index, kept current by the record store
+roster_index = RosterIndex()
+record_store.subscribe(roster_index)
+
 
 class StudentStatistics:
     @staticmethod
-    def display_statistics():
-        students = CSVHandler.read_csv('students.csv')
-        
-        # Ensure that the students list is not empty
-        if not students:
-            print("No data available.")
+    def display_statistics(course_id=None, professor_email=None):
+        result = GradeService.statistics(course_id, professor_email)
+        if result.ok:
+            print(f"Average Marks: {result.data.mean:.2f}")
+            print(f"Median Marks: {result.data.median}")
+            print(f"Highest Marks: {result.data.highest}")
+            print(f"Lowest Marks: {result.data.lowest}")
+        else:
+            result.show()
+
+    @staticmethod
+    def display_course_analytics():
+        """ Per-course percentiles and the grade distribution, computed column-wise """
+        result = GradeService.course_analytics()
+        if not result.ok:
+            result.show()
             return
-        
-        # Assuming marks are in the 6th column (index 5)
-        marks = []
-        for student in students:
-            try:
-                marks.append(int(student[5]))  # Adjust index if necessary
-            except ValueError:
-                continue  # Skip rows with invalid marks
-
-        if marks:
-            avg_marks = sum(marks) / len(marks)
-            median_marks = statistics.median(marks)
-            max_marks = max(marks)
-            min_marks = min(marks)
-
-            print(f"Average Marks: {avg_marks:.2f}")
-            print(f"Median Marks: {median_marks}")
-            print(f"Highest Marks: {max_marks}")
-            print(f"Lowest Marks: {min_marks}")
+
+        print(f"{'Course':<10}{'Count':>7}{'Mean':>8}{'Median':>8}{'P25':>7}{'P75':>7}{'P90':>7}")
+        for course_id, stats in result.data['courses'].items():
+            print(f"{course_id:<10}{stats['count']:>7}{stats['mean']:>8.2f}{stats['median']:>8.1f}"
+                  f"{stats['p25']:>7.1f}{stats['p75']:>7.1f}{stats['p90']:>7.1f}")
+
+        print("\nGrade Distribution:")
+        for grade, count in result.data['distribution'].items():
+            print(f"{grade}: {count}")
+
+# Grade Report Export
+class ReportExporter:
+    """Streams grade reports grouped by course, professor or student to a file.
+
+    If students.csv is already loaded, groups are walked in key order through
+    the record store's hash indexes. Otherwise the table is not loaded: its
+    rows stream from disk once and are put in group order by an external
+    merge sort, RUN_ROWS at a time sorted in memory and spilled to temp
+    files, then merged. A one-group report reads just that group through
+    RecordStore.find. Rows go to a 1 MiB write buffer and only the running
+    count and total of the current group are kept. The report is written to
+    a temp file and moved into place when complete.
+    Formats: csv, jsonl, and txt (fixed-width, one section per group).
+    """
+    SCOPES = ('course', 'professor', 'student')
+    FORMATS = ('csv', 'jsonl', 'txt')
+    FIELDS = {
+        'course': ['course_id', 'first_name', 'last_name', 'email', 'grade', 'marks'],
+        'professor': ['professor_email', 'course_id', 'first_name', 'last_name', 'email', 'grade', 'marks'],
+        'student': ['email', 'first_name', 'last_name', 'course_id', 'grade', 'marks'],
+    }
+    WIDTHS = {'professor_email': 30, 'course_id': 10, 'first_name': 16, 'last_name': 16,
+              'email': 30, 'grade': 6, 'marks': 6}
+    RUN_ROWS = 20_000  # Rows sorted in memory per spilled run
+
+    @staticmethod
+    def _fields(scope, row, professor_email=None):
+        if scope == 'course':
+            return [row[3], row[0], row[1], row[2], row[4], row[5]]
+        if scope == 'student':
+            return [row[2], row[0], row[1], row[3], row[4], row[5]]
+        return [professor_email, row[3], row[0], row[1], row[2], row[4], row[5]]
+
+    @staticmethod
+    def _keyed_rows(scope):
+        """ Yield ((group, rank, sequence), fields) for every report row, streamed from students.csv """
+        taught_by = {}  # course id -> [(professor email, position in the professor's courses)]
+        if scope == 'professor':
+            for professor_email, course_ids in teaching_index._map().items():
+                for rank, course_id in enumerate(course_ids):
+                    taught_by.setdefault(course_id, []).append((professor_email, rank))
+
+        header = RecordStore.HEADERS['students.csv']
+        for sequence, row in enumerate(CSVHandler.iter_rows('students.csv')):
+            if len(row) < 6 or (sequence == 0 and row[0].lstrip('\ufeff').lower() == header):
+                continue
+            if scope == 'professor':
+                for professor_email, rank in taught_by.get(row[3], ()):
+                    yield (professor_email, rank, sequence), ReportExporter._fields(scope, row, professor_email)
+            else:
+                fields = ReportExporter._fields(scope, row)
+                yield (fields[0], 0, sequence), fields
+
+    @staticmethod
+    def _sorted(keyed_rows):
+        """ Yield the (key, fields) pairs in key order, holding at most RUN_ROWS of them in memory """
+        runs = []
+        try:
+            chunk = []
+            for item in keyed_rows:
+                chunk.append(item)
+                if len(chunk) >= ReportExporter.RUN_ROWS:
+                    chunk.sort()
+                    run = tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8')
+                    csv.writer(run).writerows([*key, *fields] for key, fields in chunk)
+                    run.seek(0)
+                    runs.append(run)
+                    chunk = []
+            chunk.sort()
+            if not runs:
+                yield from chunk
+                return
+
+            def read(file):
+                for cells in csv.reader(file):
+                    yield (cells[0], int(cells[1]), int(cells[2])), cells[3:]
+
+            yield from heapq.merge(chunk, *(read(run) for run in runs))
+        finally:
+            for run in runs:
+                run.close()  # A TemporaryFile is deleted on close
+
+    @staticmethod
+    def groups(scope, key=None):
+        """ Yield (group key, rows in FIELDS order) in key order; key limits the report to one group """
+        if not record_store.loaded('students.csv'):
+            if key is not None and scope != 'professor':
+                rows = record_store.find('students.csv', 'course_id' if scope == 'course' else 'email', key)
+                yield key, (ReportExporter._fields(scope, row) for row in rows)
+                return
+            if key is not None:
+                taught = teaching_index.courses(key)
+                yield key, (ReportExporter._fields(scope, row, key) for course_id in taught
+                            for row in record_store.find('students.csv', 'course_id', course_id))
+                return
+            ordered = ReportExporter._sorted(ReportExporter._keyed_rows(scope))
+            for group, items in itertools.groupby(ordered, key=lambda item: item[0][0]):
+                yield group, (fields for _, fields in items)
+            return
+
+        by_course = record_store.index('students.csv', 'course_id')
+        if scope == 'course':
+            for course_id in [key] if key else sorted(by_course):
+                yield course_id, ([row[3], row[0], row[1], row[2], row[4], row[5]]
+                                  for row in by_course.get(course_id, ()))
+        elif scope == 'student':
+            by_email = record_store.index('students.csv', 'email')
+            for email in [key] if key else sorted(by_email):
+                yield email, ([row[2], row[0], row[1], row[3], row[4], row[5]] for row in by_email.get(email, ()))
         else:
-            print("No valid marks available.") 
+            for professor_email in [key] if key else sorted(teaching_index.professors()):
+                yield professor_email, ([professor_email, row[3], row[0], row[1], row[2], row[4], row[5]]
+                                        for row in teaching_index.enrollments(professor_email))
+
+    @staticmethod
+    def export(path, scope='course', fmt=None, key=None):
+        """ Write the report and return {path, scope, format, groups, rows, seconds} """
+        fmt = (fmt or os.path.splitext(path)[1].lstrip('.')).lower()
+        if scope not in ReportExporter.SCOPES:
+            raise ValueError(f"Unknown report scope {scope!r}; use one of {', '.join(ReportExporter.SCOPES)}.")
+        if fmt not in ReportExporter.FORMATS:
+            raise ValueError(f"Unknown report format {fmt!r}; use one of {', '.join(ReportExporter.FORMATS)}.")
+
+        start = time.perf_counter()
+        fields = ReportExporter.FIELDS[scope]
+        marks_at = fields.index('marks')
+        line_format = ''.join(f"{{:<{ReportExporter.WIDTHS[field]}}}" for field in fields[:-1]) + '{}\n'
+        # Same output as json.dumps(dict(zip(fields, row))), without building a dict per row
+        json_format = '{' + ', '.join(f'"{field}": %s' for field in fields) + '}\n'
+        quote = json.encoder.encode_basestring_ascii
+        group_count = row_count = 0
+        temp_path = path + '.tmp'
+        with open(temp_path, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as file:
+            writer = csv.writer(file)
+            if fmt == 'csv':
+                writer.writerow(fields)
+            for group, rows in ReportExporter.groups(scope, key):
+                count, total, marked = 0, 0, 0
+                if fmt == 'txt':
+                    file.write(f"== {scope.capitalize()}: {group} ==\n")
+                    file.write(line_format.format(*fields))
+                for row in rows:
+                    count += 1
+                    try:
+                        mark = int(row[marks_at])
+                    except ValueError:
+                        mark = -1  # Invalid marks are listed but not averaged
+                    if mark >= 0:
+                        total += mark
+                        marked += 1
+                    if fmt == 'csv':
+                        writer.writerow(row)
+                    elif fmt == 'jsonl':
+                        file.write(json_format % tuple(map(quote, row)))
+                    else:
+                        file.write(line_format.format(*row))
+                if fmt == 'txt':
+                    average = f"{total / marked:.2f}" if marked else "n/a"
+                    file.write(f"-- {count} record(s), average marks {average}\n\n")
+                group_count += 1
+                row_count += count
+        os.replace(temp_path, path)
+        return {'path': path, 'scope': scope, 'format': fmt, 'groups': group_count,
+                'rows': row_count, 'seconds': time.perf_counter() - start}
+
+# Columnar Grade Analytics
+class GradeColumns:
+    """Column-oriented copy of the student rows for vectorized analytics.
+
+    Marks are held as an int array and course/grade as integer codes into
+    the courses and grades lists. row_ids maps each entry back to its
+    position in the source rows (rows with invalid marks are left out).
+    Requires NumPy.
+    """
+    @staticmethod
+    def numpy_available():
+        """Import NumPy on first use (it is slow to import); False if it is missing."""
+        global np
+        if np is None:
+            try:
+                import numpy
+            except ImportError:
+                return False
+            np = numpy
+        return True
+
+    def __init__(self, rows):
+        if not GradeColumns.numpy_available():
+            raise ImportError("NumPy is required for columnar grade analytics.")
+        row_ids, course_ids, grades, marks = [], [], [], []
+        for position, row in enumerate(rows):
+            mark = GradeStatistics._parse_mark(row)
+            if mark is not None:
+                row_ids.append(position)
+                course_ids.append(row[3])
+                grades.append(row[4])
+                marks.append(mark)
+
+        self.row_ids = np.array(row_ids, dtype=np.int64)
+        self.marks = np.array(marks, dtype=np.int32)
+        courses, self.course_codes = np.unique(np.array(course_ids, dtype=str), return_inverse=True)
+        grade_names, self.grade_codes = np.unique(np.array(grades, dtype=str), return_inverse=True)
+        self.courses = courses.tolist()
+        self.grades = grade_names.tolist()
+
+    @staticmethod
+    def from_store():
+        return GradeColumns(record_store.rows('students.csv'))
+
+    def _course_moments(self):
+        counts = np.bincount(self.course_codes, minlength=len(self.courses))
+        means = np.bincount(self.course_codes, weights=self.marks, minlength=len(self.courses)) / counts
+        squares = np.bincount(self.course_codes, weights=self.marks.astype(np.float64) ** 2,
+                              minlength=len(self.courses)) / counts
+        stds = np.sqrt(np.maximum(squares - means ** 2, 0))
+        return counts, means, stds
+
+    def group_stats(self, percentiles=(25, 50, 75, 90)):
+        """Return {course_id: {'count', 'mean', 'median', 'p<q>'...}} for every course."""
+        counts, means, _ = self._course_moments()
+        # Sort marks within each course, then pick percentiles by position
+        sorted_marks = self.marks[np.lexsort((self.marks, self.course_codes))].astype(np.float64)
+        starts = np.cumsum(counts) - counts
+        columns = {'count': counts, 'mean': means}
+        for q in sorted(set(percentiles) | {50}):
+            position = starts + (counts - 1) * (q / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            columns[f'p{q}'] = sorted_marks[low] + (sorted_marks[high] - sorted_marks[low]) * (position - low)
+        columns['median'] = columns['p50']
+
+        return {
+            course_id: {name: values[code].item() for name, values in columns.items()}
+            for code, course_id in enumerate(self.courses)
+        }
+
+    def grade_distribution(self, course_id=None):
+        """Return {grade: count}, for one course or for everyone."""
+        codes = self.grade_codes
+        if course_id is not None:
+            if course_id not in self.courses:
+                return {}
+            codes = codes[self.course_codes == self.courses.index(course_id)]
+        counts = np.bincount(codes, minlength=len(self.grades))
+        return {grade: int(count) for grade, count in zip(self.grades, counts) if count}
+
+    def mark_histogram(self, bin_width=10, max_marks=100):
+        """Return (bin_edges, counts) of marks in fixed-width bins."""
+        edges = np.arange(0, max(max_marks, int(self.marks.max(initial=0))) + bin_width, bin_width)
+        counts, edges = np.histogram(self.marks, bins=edges)
+        return edges, counts
+
+    def curve(self, target_mean=75.0, target_std=10.0, max_marks=100):
+        """Rescale marks per course by z-score to the target mean and spread.
+
+        Returns an int array aligned with row_ids.
+        """
+        _, means, stds = self._course_moments()
+        course_means = means[self.course_codes]
+        course_stds = stds[self.course_codes]
+        z_scores = np.divide(self.marks - course_means, course_stds,
+                             out=np.zeros(len(self.marks)), where=course_stds > 0)
+        return np.clip(np.rint(target_mean + z_scores * target_std), 0, max_marks).astype(np.int32)
+
+
+# Synthetic Data
+class SyntheticData:
+    """Deterministic fake records for timing searches and benchmarks."""
+    FIRST_NAMES = ['Aarav', 'Bella', 'Carlos', 'Deepa', 'Elena', 'Farid', 'Grace', 'Hiro',
+                   'Isla', 'Jamal', 'Keiko', 'Liam', 'Maya', 'Noah', 'Olga', 'Priya']
+    LAST_NAMES = ['Anand', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Haddad',
+                  'Ito', 'Johnson', 'Kumar', 'Lopez', 'Muller', 'Nguyen', 'Okafor', 'Singh']
+
+    @staticmethod
+    def course_ids(count):
+        return [f"SYN{i:04d}" for i in range(count)]
+
+    @staticmethod
+    def student_rows(count, course_count=50, courses_per_student=3, seed=42):
+        """Yield count enrollment rows, courses_per_student per student, with valid grades."""
+        rng = random.Random(seed)
+        courses = SyntheticData.course_ids(course_count)
+        marks_text = [str(mark) for mark in range(GradeValidator.MAX_MARKS + 1)]
+        grades = [GradeValidator.grade_for(mark) for mark in range(GradeValidator.MAX_MARKS + 1)]
+        first_name = last_name = email = None
+        for i in range(count):
+            student, nth_course = divmod(i, courses_per_student)
+            if nth_course == 0:
+                first_name = rng.choice(SyntheticData.FIRST_NAMES)
+                last_name = rng.choice(SyntheticData.LAST_NAMES)
+                email = f"student{student}@sjsu.edu"
+            mark = rng.randint(40, GradeValidator.MAX_MARKS)
+            course_id = courses[(student * courses_per_student + nth_course) % course_count]
+            yield [first_name, last_name, email, course_id, grades[mark], marks_text[mark]]
+
+    @staticmethod
+    def write_dataset(directory, enrollments, courses_per_student=3, password='password', seed=42):
+        """Write students/courses/professors/login CSVs for a synthetic term into directory.
+
+        Every login shares one password hash so generating millions of users
+        stays cheap. Returns a summary with the counts and sample keys.
+        """
+        os.makedirs(directory, exist_ok=True)
+        course_count = max(5, enrollments // 2000)
+        course_ids = SyntheticData.course_ids(course_count)
+        professor_count = max(1, course_count // 2)
+        student_count = -(-enrollments // courses_per_student)
+
+        def write(filename, header, rows):
+            with open(os.path.join(directory, filename), mode='w', newline='',
+                      encoding='utf-8', buffering=1 << 20) as file:
+                writer = csv.writer(file)
+                writer.writerow(header)
+                writer.writerows(rows)
+
+        write('students.csv', ['first_name', 'last_name', 'email', 'course_id', 'grade', 'marks'],
+              SyntheticData.student_rows(enrollments, course_count, courses_per_student, seed))
+        write('courses.csv', ['Course_id', 'Course_name', 'Description'],
+              ([course_id, f"Course {course_id}", f"Description of Course {course_id}"] for course_id in course_ids))
+        # Each professor teaches every professor_count-th course
+        professors = [(f"Professor {i}", f"professor{i}@sjsu.edu") for i in range(professor_count)]
+        write('professors.csv', ['name', 'email', 'rank', 'course_id'],
+              ([*professors[i % professor_count], 'Professor', course_id] for i, course_id in enumerate(course_ids)))
+        hashed = PasswordHasher.hash(password)
+        write('login.csv', ['email', 'password', 'role'],
+              [*([f"student{i}@sjsu.edu", hashed, 'student'] for i in range(student_count)),
+               *([email, hashed, 'professor'] for _, email in professors)])
+
+        return {
+            'enrollments': enrollments,
+            'students': student_count,
+            'courses': course_count,
+            'professors': professor_count,
+            'student_emails': [f"student{i}@sjsu.edu" for i in range(min(student_count, 1000))],
+            'course_ids': course_ids,
+            'professor_emails': [email for _, email in professors],
+            'password': password,
+        }
+
+
+# Timed Search and Sort
+class SearchEngine:
+    """Sorted indexes over the student rows for logarithmic search and sort.
+
+    Each index is a pair of parallel lists (sorted keys, rows) built once on
+    first use; searches bisect the keys instead of scanning every row.
+    """
+    INDEX_KEYS = {
+        'email': lambda row: row[2],
+        'course_id': lambda row: row[3],
+        'first_name': lambda row: row[0].lower(),
+        'last_name': lambda row: row[1].lower(),
+    }
+    SORT_KEYS = {
+        'marks': lambda row: SearchEngine._marks_key(row),
+        'name': lambda row: (row[1].lower(), row[0].lower(), row[2]),
+        'email': lambda row: (row[2], row[3]),
+    }
+
+    _shared = None  # (store version, engine) for the live students table
+
+    @staticmethod
+    def _marks_key(row):
+        # Highest marks first; rows without valid marks go last
+        mark = GradeStatistics._parse_mark(row)
+        return (mark is None, -(mark or 0), row[2])
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.indexes = {}  # name -> (keys, rows)
+        self.sorted_rows = {}  # sort key -> rows
+
+    @staticmethod
+    def for_store():
+        """Return an engine over students.csv, rebuilt only after the table changes."""
+        version = record_store.version('students.csv')
+        if SearchEngine._shared is None or SearchEngine._shared[0] != version:
+            SearchEngine._shared = (version, SearchEngine(record_store.rows('students.csv')))
+        return SearchEngine._shared[1]
+
+    def _index(self, name):
+        if name not in self.indexes:
+            key = self.INDEX_KEYS[name]
+            ordered = sorted(self.rows, key=key)
+            self.indexes[name] = ([key(row) for row in ordered], ordered)
+        return self.indexes[name]
+
+    def _range(self, name, low, high):
+        keys, rows = self._index(name)
+        return rows[bisect.bisect_left(keys, low):bisect.bisect_left(keys, high)]
+
+    def sort_by(self, field):
+        """Return the rows ordered by 'marks' (highest first), 'name' or 'email'."""
+        if field not in self.sorted_rows:
+            self.sorted_rows[field] = sorted(self.rows, key=self.SORT_KEYS[field])
+        return self.sorted_rows[field]
+
+    def search_email(self, email):
+        return self._range('email', email, email + '\0')
+
+    def search_course(self, course_id):
+        return self._range('course_id', course_id, course_id + '\0')
+
+    def search_name_prefix(self, prefix):
+        """Rows whose first or last name starts with prefix (case-insensitive)."""
+        prefix = prefix.lower()
+        matches = self._range('first_name', prefix, prefix + '\uffff')
+        seen = {id(row) for row in matches}
+        matches += [row for row in self._range('last_name', prefix, prefix + '\uffff') if id(row) not in seen]
+        return matches
+
+    @staticmethod
+    def timed(label, operation, *args):
+        """Run operation(*args), print how long it took and return its result."""
+        start = time.perf_counter()
+        result = operation(*args)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[time] {label}: {len(result)} record(s) in {elapsed_ms:.3f} ms")
+        return result
+
+    @staticmethod
+    def compare_with_linear_scan(sizes=(10_000, 100_000, 1_000_000), queries=20, seed=7):
+        """Time indexed searches against naive scans on synthetic datasets and return the results."""
+        results = []
+        print(f"{'Rows':>10}{'Build ms':>11}{'Operation':>12}{'Scan ms':>11}{'Index ms':>11}{'Speedup':>10}")
+        for size in sizes:
+            rows = list(SyntheticData.student_rows(size))
+            rng = random.Random(seed)
+            emails = [rows[rng.randrange(size)][2] for _ in range(queries)]
+            course_ids = [rows[rng.randrange(size)][3] for _ in range(queries)]
+            prefixes = [rng.choice(SyntheticData.LAST_NAMES)[:3].lower() for _ in range(queries)]
+
+            start = time.perf_counter()
+            engine = SearchEngine(rows)
+            for name in SearchEngine.INDEX_KEYS:
+                engine._index(name)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            cases = [
+                ('email', emails, engine.search_email, lambda q: [r for r in rows if r[2] == q]),
+                ('course_id', course_ids, engine.search_course, lambda q: [r for r in rows if r[3] == q]),
+                ('name', prefixes, engine.search_name_prefix,
+                 lambda q: [r for r in rows if r[0].lower().startswith(q) or r[1].lower().startswith(q)]),
+            ]
+            for operation, inputs, indexed, linear in cases:
+                timings = []
+                for search in (linear, indexed):
+                    start = time.perf_counter()
+                    for query in inputs:
+                        search(query)
+                    timings.append((time.perf_counter() - start) * 1000 / len(inputs))
+                scan_ms, index_ms = timings
+                speedup = scan_ms / index_ms if index_ms else float('inf')
+                print(f"{size:>10}{build_ms:>11.1f}{operation:>12}{scan_ms:>11.3f}{index_ms:>11.4f}{speedup:>9.0f}x")
+                results.append({'rows': size, 'build_ms': build_ms, 'operation': operation,
+                                'scan_ms': scan_ms, 'index_ms': index_ms})
+        return results
+
 
 #Text Security Class
 class TextSecurity:
     """This class encrypts the text using Caesar cipher."""
+    _tables = {}  # shift -> str.translate table, shared by all instances
+
     def __init__(self, shift):
         self.shifter = shift
         self.s = self.shifter % 26
 
+    @staticmethod
+    def _table(s):
+        s %= 26
+        if s not in TextSecurity._tables:
+            lower, upper = string.ascii_lowercase, string.ascii_uppercase
+            TextSecurity._tables[s] = str.maketrans(lower + upper, lower[s:] + lower[:s] + upper[s:] + upper[:s])
+        return TextSecurity._tables[s]
+
     def _convert(self, text, s):
-        result = ""
-        for ch in text:
-            if ch.isupper():
-                result += chr((ord(ch) + s - 65) % 26 + 65)
-            elif ch.islower():
-                result += chr((ord(ch) + s - 97) % 26 + 97)
-            else:
-                result += ch  # keep non-alphabet chars (like #, _, numbers)
-        return result
+        # Non-alphabet chars (like #, _, numbers) are not in the table and stay as they are
+        return text.translate(TextSecurity._table(s))
 
     def encrypt(self, text):
         return self._convert(text, self.shifter)
@@ -280,15 +2275,136 @@ class TextSecurity:
     def decrypt(self, text):
         return self._convert(text, 26 - self.s)
 
+    def encrypt_many(self, texts):
+        table = TextSecurity._table(self.shifter)
+        return [text.translate(table) for text in texts]
+
+    def decrypt_many(self, texts):
+        table = TextSecurity._table(26 - self.s)
+        return [text.translate(table) for text in texts]
+
+# Password Hashing
+class PasswordHasher:
+    """Salted PBKDF2-SHA256 hashes stored as pbkdf2_sha256$iterations$salt$hash.
+
+    ITERATIONS is the tunable cost; calibrate() (--calibrate) picks it so one
+    hash fits the per-login latency budget (--login-budget-ms) on this
+    machine and save_cost() keeps it in SETTINGS next to the tables, where
+    load_cost() finds it on the next start. Stored hashes are only redone
+    when they are weaker than ITERATIONS. last_ms holds the duration of the
+    most recent hash or verify and over_budget counts those that went past
+    the budget; the login front ends warn with budget_warning().
+    """
+    PREFIX = 'pbkdf2_sha256'
+    ITERATIONS = 80_000  # A rung of calibrate()'s ladder that fits LOGIN_BUDGET_MS on a laptop core
+    LOGIN_BUDGET_MS = 100.0
+    SETTINGS = 'hashing.json'
+    last_ms = 0.0
+    over_budget = 0
+
+    @staticmethod
+    def _derive(password, salt, iterations):
+        start = time.perf_counter()
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+        PasswordHasher.last_ms = (time.perf_counter() - start) * 1000
+        if PasswordHasher.last_ms > PasswordHasher.LOGIN_BUDGET_MS:
+            PasswordHasher.over_budget += 1
+        return digest
+
+    @staticmethod
+    def budget_warning(elapsed_ms):
+        """Return a warning if a login's hashing took longer than LOGIN_BUDGET_MS, else None."""
+        if elapsed_ms <= PasswordHasher.LOGIN_BUDGET_MS:
+            return None
+        return (f"Password hashing took {elapsed_ms:.0f} ms, over the {PasswordHasher.LOGIN_BUDGET_MS:.0f} ms "
+                f"login budget; run with --calibrate to retune it.")
+
+    @staticmethod
+    def hash(password, iterations=None):
+        iterations = iterations or PasswordHasher.ITERATIONS
+        salt = secrets.token_bytes(16)
+        digest = PasswordHasher._derive(password, salt, iterations)
+        return f"{PasswordHasher.PREFIX}${iterations}${salt.hex()}${digest.hex()}"
+
+    @staticmethod
+    def is_hashed(stored):
+        return stored.startswith(PasswordHasher.PREFIX + '$')
+
+    @staticmethod
+    def verify(password, stored):
+        try:
+            _, iterations, salt, digest = stored.split('$')
+            expected = bytes.fromhex(digest)
+            actual = PasswordHasher._derive(password, bytes.fromhex(salt), int(iterations))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    @staticmethod
+    def needs_rehash(stored):
+        """True for legacy passwords and hashes weaker than ITERATIONS; stronger ones are kept."""
+        if not PasswordHasher.is_hashed(stored):
+            return True
+        try:
+            return int(stored.split('$')[1]) < PasswordHasher.ITERATIONS
+        except (IndexError, ValueError):
+            return True
+
+    @staticmethod
+    def calibrate(budget_ms=None, sample_iterations=20_000, samples=3):
+        """Set ITERATIONS so one hash fits in budget_ms here, and return it.
+
+        The fastest of a few timed samples sets the rate, and the count is
+        rounded down to a power of two times 10,000, so that noise between
+        runs rarely moves it. Call save_cost() to keep the result.
+        """
+        budget_ms = budget_ms or PasswordHasher.LOGIN_BUDGET_MS
+        fastest_ms = float('inf')
+        for _ in range(samples):
+            start = time.perf_counter()
+            hashlib.pbkdf2_hmac('sha256', b'calibration', b'0' * 16, sample_iterations)
+            fastest_ms = min(fastest_ms, (time.perf_counter() - start) * 1000)
+        fitting = budget_ms * sample_iterations / max(fastest_ms, 1e-6)
+        iterations = 10_000
+        while iterations * 2 <= fitting:
+            iterations *= 2
+        PasswordHasher.ITERATIONS = iterations
+        return iterations
+
+    @staticmethod
+    def save_cost():
+        """Keep ITERATIONS and the budget it was calibrated for in SETTINGS."""
+        path = CSVHandler.get_file_path(PasswordHasher.SETTINGS)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({'iterations': PasswordHasher.ITERATIONS,
+                       'login_budget_ms': PasswordHasher.LOGIN_BUDGET_MS}, file)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load_cost():
+        """Adopt a saved cost and budget from SETTINGS; returns False if there is none."""
+        try:
+            with open(CSVHandler.get_file_path(PasswordHasher.SETTINGS), encoding='utf-8') as file:
+                settings = json.load(file)
+            PasswordHasher.ITERATIONS = int(settings['iterations'])
+            PasswordHasher.LOGIN_BUDGET_MS = float(settings['login_budget_ms'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+
 #LoginUser Class
 class LoginUser:
-    def __init__(self, email, password, role, shift=4):
+    # Caesar shift of legacy (not yet hashed) passwords; see rotate_key
+    SHIFT = int(os.environ.get('CHECKMYGRADE_SHIFT', 4))
+
+    def __init__(self, email, password, role, shift=None):
         if not email:
             raise ValueError("Email cannot be empty.")
         self.email = email
         self.password = password
         self.role = role
-        self.security = TextSecurity(shift)
+        self.security = TextSecurity(LoginUser.SHIFT if shift is None else shift)
 
     def encrypt_password(self):
         return self.security.encrypt(self.password)
@@ -297,132 +2413,93 @@ class LoginUser:
         return self.security.decrypt(encrypted_password)
 
     @staticmethod
-    def register_user(email, password, role, file_path="login.csv", shift=4):
-        file_path = CSVHandler.get_file_path(file_path)
-        if not email:
-            print("[!] Email cannot be empty.")
-            return False
-        
-        if not LoginUser.is_unique_email(email, file_path):
-            print("[!] Email already exists.")
-            return False
-
-        security = TextSecurity(shift)
-        encrypted = security.encrypt(password)
-
-        if os.path.exists(file_path):
-            with open(file_path, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row["email"] == email:
-                        print("[!] User already exists.")
-                        return False
-
-        with open(file_path, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            if os.stat(file_path).st_size == 0:
-                writer.writerow(["email", "password", "role"])  # header
-            writer.writerow([email, encrypted, role])
-            print("[+] User registered successfully.")
-            return True
+    def register_user(email, password, role, file_path="login.csv", shift=None):
+        return GradeService.register(email, password, role, file_path).show().ok
         
     @staticmethod
     def is_unique_email(email, file_path="login.csv"):
-        try:
-            with open(file_path, mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row["email"] == email:
-                        return False
-            return True
-        except FileNotFoundError:
-            return True
-        return True
+        return not record_store.lookup(file_path, 'email', email)
     
     @staticmethod
-    def login_user(email, password, file_path="login.csv", shift=4):
-        file_path = CSVHandler.get_file_path(file_path)
-        if not email:
-            print("[!] Email cannot be empty.")
-            return None
-        security = TextSecurity(shift)
-        try:
-            with open(file_path, mode='r',encoding='utf-8-sig') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if "email" in row:
-                        if row["email"] == email:
-                            decrypted = security.decrypt(row["password"])
-                            if decrypted.strip() == password.strip():
-                                print(f"[+] Login successful! Welcome, {email}")
-                                print(f"Role: {row['role']}")
-                                # The rest of the code
-                            
-                                if row["role"] == "student":
-                                
-                                    student_data = CSVHandler.read_csv('students.csv')
-                                    for data in student_data:
-                                        if data[2] == email:
-                                            first_name, last_name, _, course_id, grade, marks = data
-                                            return Student(first_name, last_name, email, course_id, grade, marks)
-                                    
-                                elif row["role"] == "professor":
-                                    professor_data = CSVHandler.read_csv('professors.csv')  
-                                    for data in professor_data:
-                                        if data[1] == email:
-                                            name, email, rank, course_id = data
-                                            return Professor(name, email, rank, course_id)
-                                else:
-                                    print("[!] Invalid role.")
-                                    return None
-                            else:
-                                print("[!] Incorrect password.")
-                                return None
-            print("[!] User not found.")
-            return None
-        except FileNotFoundError:
-            print("[!] Login file not found.")
-            return None
+    def _verify_password(row, password, file_path, shift):
+        """ Check a password against a login row, upgrading legacy or outdated hashes """
+        if not LoginUser._password_matches(row[1], password, shift):
+            return False
+        if PasswordHasher.needs_rehash(row[1]):
+            LoginUser._store_hash(row, PasswordHasher.hash(password.strip()), file_path)
+        return True
 
     @staticmethod
-    def change_password(email, new_password, file_path="login.csv", shift=4):
-        security = TextSecurity(shift)
-        updated = False
-        rows = []
+    def _password_matches(stored_password, password, shift=None):
+        """ Compare a password with a stored hash or legacy Caesar text; touches no shared state """
+        if PasswordHasher.is_hashed(stored_password):
+            return PasswordHasher.verify(password.strip(), stored_password)
+        return TextSecurity(LoginUser.SHIFT if shift is None else shift).decrypt(stored_password).strip() == password.strip()
 
-        try:
+    @staticmethod
+    def _store_hash(row, hashed, file_path="login.csv"):
+        """ Replace the password of a login row with a new hash """
+        CSVHandler.apply_changes(file_path, [('update', [row[0], hashed, row[2]])])
+        record_store.update(file_path, row, {1: hashed})
+        return Result(True, "Password hash upgraded.")
 
-            file_path = CSVHandler.get_file_path(file_path)
-            print(f"Login CSV fiel path: {file_path}")
+    @staticmethod
+    def login_user(email, password, file_path="login.csv", shift=None):
+        PasswordHasher.last_ms = 0.0
+        result = GradeService.login(email, password, file_path, shift)
+        warning = PasswordHasher.budget_warning(PasswordHasher.last_ms)
+        if warning:
+            print(f"[!] {warning}")
+        result.show()
+        if not result.ok:
+            return None
+        print(f"Role: {'student' if isinstance(result.data, Student) else 'professor'}")
+        return result.data
 
-            with open(file_path, mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    #if row["email"] == email:
-                    if row.get("email", "").strip() == email.strip():
-                      row["password"] = security.encrypt(new_password)
-                    updated = True
-                    rows.append(row)
+    @staticmethod
+    def change_password(email, new_password, file_path="login.csv", shift=None):
+        GradeService.change_password(email, new_password, file_path).show()
 
-            if updated:
-                with open(file_path, mode='w', newline='') as file:
-                    fieldnames = ["email", "password", "role"]
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(rows)
-                print("[+] Password updated successfully.")
-            else:
-                print("[!] User not found.")
-        except FileNotFoundError:
-            print("[!] Login file not found.")
-        except Exception as e:
-            print(f"[!] An error occurred while updating the password in the CSV file: {e}")
+    @staticmethod
+    def rotate_key(old_shift, new_shift, file_path="login.csv", batch_size=10000):
+        """ Re-encrypt every legacy Caesar password from old_shift to new_shift in one streaming pass.
+
+        Hashed passwords are left alone. Pending change-log records are folded
+        into the rewritten file. Returns the number of passwords rotated.
+        """
+        rotation = TextSecurity(new_shift - old_shift)
+        rotated = 0
+
+        def rotate(batch):
+            nonlocal rotated
+            legacy = [i for i, row in enumerate(batch) if len(row) > 1 and not PasswordHasher.is_hashed(row[1])]
+            for i, password in zip(legacy, rotation.encrypt_many([batch[i][1] for i in legacy])):
+                batch[i][1] = password
+            rotated += len(legacy)
+            return batch
+
+        def rotated_rows():
+            rows = CSVHandler.iter_rows(file_path)
+            yield next(rows, ["email", "password", "role"])  # header
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield from rotate(batch)
+                    batch = []
+            yield from rotate(batch)
+
+        with FileLock.hold(file_path), ChangeLog._lock:
+            CSVHandler.rewrite(file_path, rotated_rows())
+        record_store.invalidate(file_path)
+        return rotated
 
 #Session Class
 class Session:
     """A simple session manager for tracking logged-in users."""
     def __init__(self):
         self.logged_in_user = None  # Stores the logged-in user object
+        self.token = None  # Set when the session belongs to a SessionManager
 
     def set_user(self, user):
         """Set the currently logged-in user."""
@@ -439,13 +2516,778 @@ class Session:
 # Create a session instance
 session = Session()
 
+
+# Token-Keyed Session Store
+class SessionManager:
+    """Many Session objects at once, each found by an opaque token.
+
+    Sessions are kept in an OrderedDict in least-recently-used order, so a
+    lookup, a touch and an eviction are all O(1). A session idle for longer
+    than ttl seconds expires; once max_sessions are live, creating another
+    evicts the least recently used one. Expired sessions sit at the front of
+    the order and are dropped as later calls walk past them.
+    """
+
+    def __init__(self, ttl=1800.0, max_sessions=10_000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = collections.OrderedDict()  # token -> (Session, last used)
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _drop(self, token):
+        stale, _ = self._sessions.pop(token)
+        stale.clear_user()
+        stale.token = None
+
+    def _purge(self, now):
+        while self._sessions:
+            token, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl:
+                break
+            self._drop(token)
+            self.expired += 1
+
+    def create(self, user=None):
+        """ Start a session (optionally already logged in) and return its token """
+        token = secrets.token_urlsafe(32)
+        new_session = Session()
+        new_session.token = token
+        if user is not None:
+            new_session.set_user(user)
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+                self.evicted += 1
+            self._sessions[token] = (new_session, now)
+        return token
+
+    def get(self, token):
+        """ Return the live Session for token, or None if it is unknown or expired """
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            self._sessions[token] = (entry[0], now)
+            self._sessions.move_to_end(token)
+            return entry[0]
+
+    def end(self, token):
+        """ Log the session out and forget its token """
+        with self._lock:
+            if token in self._sessions:
+                self._drop(token)
+
+    def stats(self):
+        return {'active': len(self._sessions), 'expired': self.expired, 'evicted': self.evicted,
+                'max_sessions': self.max_sessions, 'ttl': self.ttl}
+
+# Service Results
+@dataclasses.dataclass
+class Result:
+    """Outcome of a service call: whether it worked, a message for the user and the payload."""
+    ok: bool
+    message: str = ''
+    data: object = None
+
+    def show(self):
+        """ Print the message the way the menus always have and return the result """
+        if self.message:
+            print(f"[{'+' if self.ok else '!'}] {self.message}")
+        return self
+
+
+@dataclasses.dataclass
+class GradeRecord:
+    first_name: str
+    last_name: str
+    email: str
+    course_id: str
+    grade: str
+    marks: str
+
+    @staticmethod
+    def from_row(row):
+        return GradeRecord(*row[:6])
+
+
+@dataclasses.dataclass
+class CourseRecord:
+    course_id: str
+    course_name: str
+    description: str
+    professor_email: str = ''
+
+
+@dataclasses.dataclass
+class ProfessorRecord:
+    name: str
+    email: str
+    rank: str
+    course_id: str
+    course_ids: list = dataclasses.field(default_factory=list)  # Every course taught, in professors.csv order
+
+
+@dataclasses.dataclass
+class RosterPage:
+    course_id: str
+    total: int
+    offset: int
+    records: list
+
+
+@dataclasses.dataclass
+class MarkSummary:
+    count: int
+    mean: float
+    median: float
+    highest: int
+    lowest: int
+
+
+# Headless Service Layer
+class GradeService:
+    """The application's operations as plain calls that return a Result.
+
+    Nothing here reads input() or prints, so batch jobs, benchmarks and other
+    front ends can call it directly. The menus in CheckMyGrade and the
+    printing helpers on the domain classes are thin clients of these calls.
+    Role checks are left to the caller, which knows who is logged in.
+    """
+
+    @staticmethod
+    def login(email, password, file_path="login.csv", shift=None):
+        """ Verify the credentials; the result carries the Student or Professor """
+        found = GradeService.credentials(email, file_path)
+        if not found.ok:
+            return found
+        if not LoginUser._verify_password(found.data, password, file_path, shift):
+            return Result(False, "Incorrect password.")
+        return GradeService.signed_in(email, found.data[2])
+
+    @staticmethod
+    def credentials(email, file_path="login.csv"):
+        """ Find a user's login row; one dictionary lookup in the credential index """
+        if not email:
+            return Result(False, "Email cannot be empty.")
+        if not CSVHandler.exists(file_path):
+            return Result(False, "Login file not found.")
+        credentials = record_store.lookup(file_path, 'email', email)
+        if not credentials:
+            return Result(False, "User not found.")
+        return Result(True, data=credentials[0])
+
+    @staticmethod
+    def signed_in(email, role):
+        """ Build the Student or Professor for a user whose password has been checked """
+        welcome = f"Login successful! Welcome, {email}"
+        if role == "student":
+            for first_name, last_name, _, course_id, grade, marks in record_store.find('students.csv', 'email', email):
+                return Result(True, welcome, Student(first_name, last_name, email, course_id, grade, marks))
+        elif role == "professor":
+            for name, _, rank, course_id in record_store.lookup('professors.csv', 'email', email):
+                return Result(True, welcome, Professor(name, email, rank, course_id))
+        else:
+            return Result(False, "Invalid role.")
+        return Result(False, "User not found.")
+
+    @staticmethod
+    def register(email, password, role, file_path="login.csv"):
+        if not email:
+            return Result(False, "Email cannot be empty.")
+        if not LoginUser.is_unique_email(email, file_path):
+            return Result(False, "Email already exists.")
+
+        hashed = PasswordHasher.hash(password.strip())
+        if CSVHandler.backend is not None or ChangeLog.has_pending(file_path):
+            CSVHandler.apply_changes(file_path, [('insert', [email, hashed, role])])
+        else:
+            full_path = CSVHandler.get_file_path(file_path)
+            with FileLock.hold(file_path):
+                with open(full_path, mode='a', newline='') as file:
+                    writer = csv.writer(file)
+                    if os.stat(full_path).st_size == 0:
+                        writer.writerow(["email", "password", "role"])  # header
+                    writer.writerow([email, hashed, role])
+                record_store.touch(file_path)
+        record_store.append(file_path, [[email, hashed, role]])
+        return Result(True, "User registered successfully.")
+
+    @staticmethod
+    def change_password(email, new_password, file_path="login.csv"):
+        if not CSVHandler.exists(file_path):
+            return Result(False, "Login file not found.")
+
+        try:
+            credentials = record_store.lookup(file_path, 'email', email.strip())
+            if not credentials:
+                return Result(False, "User not found.")
+            row = credentials[0]
+            hashed = PasswordHasher.hash(new_password.strip())
+            # Log the single-row update instead of rewriting login.csv
+            CSVHandler.apply_changes(file_path, [('update', [row[0], hashed, row[2]])])
+            record_store.update(file_path, row, {1: hashed})
+            return Result(True, "Password updated successfully.")
+        except Exception as e:
+            return Result(False, f"An error occurred while updating the password in the CSV file: {e}")
+
+    @staticmethod
+    def courses():
+        return Result(True, data=[CourseRecord(*row[:4]) for row in record_store.rows('courses.csv')])
+
+    @staticmethod
+    def professors():
+        """ One record per professor, with every course they teach """
+        records, seen = [], set()
+        for row in record_store.rows('professors.csv'):
+            if len(row) >= 4 and row[1] not in seen:
+                seen.add(row[1])
+                records.append(ProfessorRecord(*row[:4], Professor(*row[:4]).course_ids))
+        return Result(True, data=records)
+
+    @staticmethod
+    def student_grades(email):
+        records = [GradeRecord.from_row(row) for row in record_store.find('students.csv', 'email', email)]
+        if not records:
+            return Result(False, "Student not found.", records)
+        return Result(True, data=records)
+
+    @staticmethod
+    def grades_by_course(course_id):
+        records = [GradeRecord.from_row(row) for row in record_store.lookup('students.csv', 'course_id', course_id)]
+        if not records:
+            return Result(False, f"No records found for course {course_id}.", records)
+        return Result(True, data=records)
+
+    @staticmethod
+    def roster(course_id, offset=0, limit=None):
+        """ One page of a course's roster sorted by name, with the total enrollment """
+        total = roster_index.count(course_id)
+        if not total:
+            return Result(False, f"No students found for course {course_id}.", RosterPage(course_id, 0, offset, []))
+        records = [GradeRecord.from_row(row) for row in roster_index.page(course_id, offset, limit)]
+        return Result(True, data=RosterPage(course_id, total, offset, records))
+
+    @staticmethod
+    def roster_count(course_id):
+        return Result(True, data=roster_index.count(course_id))
+
+    @staticmethod
+    def grades_by_professor(professor_email):
+        """ Grades in every course the professor teaches """
+        if not teaching_index.courses(professor_email):
+            return Result(False, f"No professor found with email {professor_email}.", [])
+        records = [GradeRecord.from_row(row) for row in teaching_index.enrollments(professor_email)]
+        if not records:
+            return Result(False, "No student grades found for this professor.", records)
+        return Result(True, data=records)
+
+    @staticmethod
+    def add_student(first_name, last_name, email, course_id, grade, marks):
+        """ Append one validated enrollment to students.csv """
+        student_data = [first_name, last_name, email, course_id, grade, marks]
+        errors = GradeValidator.validate_rows([student_data])
+        if errors:
+            return Result(False, f"Student {first_name} {last_name} was not added: {errors[0][1]}")
+        if GradeValidator.is_enrolled(email, course_id):
+            return Result(False, f"Student {first_name} {last_name} was not added: "
+                                 f"duplicate record for {email} in {course_id}")
+        if not CSVHandler.write_csv('students.csv', [student_data], mode="a", quiet=True):
+            return Result(False, f"Student {first_name} {last_name} was not added.")
+        record_store.append('students.csv', [student_data])
+        return Result(True, f"Student {first_name} {last_name} added successfully to course {course_id}.",
+                      GradeRecord.from_row(student_data))
+
+    @staticmethod
+    def update_student(email, course_id, grade, marks):
+        """ Change one enrollment's grade and marks; saved by the next batched flush """
+        rows = record_store.lookup('students.csv', 'email', email)
+        if not rows:
+            return Result(False, f"Student with email {email} not found.")
+        enrolled = [row for row in rows if row[3] == course_id]
+        if not enrolled:
+            return Result(False, f"Student is not enrolled in the course: {course_id}.")
+        errors = GradeValidator.validate_rows([enrolled[0][:4] + [grade, marks]])
+        if errors:
+            return Result(False, f"Record for {email} in {course_id} was not updated: {errors[0][1]}")
+        for row in enrolled:
+            record_store.update('students.csv', row, {4: grade, 5: marks})
+            student_changes.register_dirty(row)
+        return Result(True, f"Updated record for {enrolled[0][0]} {enrolled[0][1]} in course {course_id}.",
+                      GradeRecord.from_row(enrolled[0]))
+
+    @staticmethod
+    def delete_student(email, course_id=None):
+        """ Delete every enrollment of a student, or just the one in course_id; carries the row count """
+        result = GradeService.delete_students([email if course_id is None else (email, course_id)])
+        if result.data is None:
+            return Result(False, result.message, 0)
+        removed = len(result.data['removed'])
+        if not removed:
+            where = f" in course {course_id}" if course_id else ""
+            return Result(False, f"Student with email {email} not found{where}.", 0)
+        if course_id:
+            return Result(True, f"Student with email {email} has been removed from course {course_id}.", removed)
+        return Result(True, f"Student with email {email} has been deleted.", removed)
+
+    @staticmethod
+    def delete_students(targets):
+        """ Delete many enrollments in one pass.
+
+        targets mixes emails (every enrollment of that student) and
+        (email, course_id) pairs (that one enrollment). All the deletes go
+        to the change log in one append, then leave the record store and its
+        indexes together. The result carries {'removed': [GradeRecord],
+        'not_found': [targets that matched nothing]}.
+        """
+        rows, seen, not_found = [], set(), []
+        for target in targets:
+            email, course_id = (target, None) if isinstance(target, str) else target
+            matches = [row for row in record_store.lookup('students.csv', 'email', email)
+                       if course_id is None or row[3] == course_id]
+            if not matches:
+                not_found.append(target)
+            for row in matches:
+                if id(row) not in seen:
+                    seen.add(id(row))
+                    rows.append(row)
+
+        try:
+            if rows:
+                CSVHandler.apply_changes('students.csv', [('delete', row) for row in rows])
+                record_store.remove_rows('students.csv', rows)
+        except FileNotFoundError:
+            return Result(False, "The file 'students.csv' was not found.")
+        except Exception as e:
+            return Result(False, f"An error occurred while deleting the student: {e}")
+
+        report = {'removed': [GradeRecord.from_row(row) for row in rows], 'not_found': not_found}
+        message = f"Deleted {len(rows)} enrollment(s) of {len({row[2] for row in rows})} student(s)."
+        if not_found:
+            message += f" {len(not_found)} not found."
+        return Result(bool(rows), message, report)
+
+    @staticmethod
+    def add_course(course_id, course_name, description, professor_email=None):
+        row = [course_id, course_name, description] + ([professor_email] if professor_email else [])
+        if not CSVHandler.write_csv('courses.csv', [row], quiet=True):
+            return Result(False, f"Course {course_id} was not added.")
+        record_store.invalidate('courses.csv')
+        return Result(True, "Course added successfully!", CourseRecord(*row))
+
+    @staticmethod
+    def add_professor(name, email, rank, course_id):
+        row = [name, email, rank, course_id]
+        if not CSVHandler.write_csv('professors.csv', [row], quiet=True):
+            return Result(False, f"Professor {name} was not added.")
+        record_store.invalidate('professors.csv')
+        return Result(True, f"Professor {name} added to course {course_id}.",
+                      ProfessorRecord(*row, Professor(*row).course_ids))
+
+    @staticmethod
+    def statistics(course_id=None, professor_email=None):
+        """ Mark summary overall, for one course or for one professor's courses """
+        if not record_store.rows('students.csv'):
+            return Result(False, "No data available.")
+        aggregate = grade_statistics.aggregate(course_id, professor_email)
+        if aggregate is None or not aggregate.count:
+            return Result(False, "No valid marks available.")
+        return Result(True, data=MarkSummary(aggregate.count, aggregate.mean(), aggregate.median(),
+                                             aggregate.maximum(), aggregate.minimum()))
+
+    @staticmethod
+    def course_analytics():
+        """ Per-course percentiles and the grade distribution; needs NumPy """
+        if not GradeColumns.numpy_available():
+            return Result(False, "Course analytics need NumPy (pip install numpy).")
+        columns = GradeColumns.from_store()
+        if not len(columns.marks):
+            return Result(False, "No valid marks available.")
+        return Result(True, data={'courses': columns.group_stats(), 'distribution': columns.grade_distribution()})
+
+    @staticmethod
+    def export_report(path, scope='course', fmt=None, key=None):
+        """ Stream a grade report to a csv, jsonl or txt file; see ReportExporter """
+        try:
+            report = ReportExporter.export(path, scope, fmt, key)
+        except (ValueError, OSError) as e:
+            return Result(False, f"Report not written: {e}")
+        return Result(True, f"Wrote {report['rows']} row(s) in {report['groups']} group(s) to {path} "
+                            f"in {report['seconds']:.2f}s.", report)
+
+    IMPORT_FIELDS = ['first_name', 'last_name', 'email', 'course_id', 'grade', 'marks']
+
+    @staticmethod
+    def _read_import_rows(source_path):
+        """ Yield (row_number, row or None) from a CSV (with header) or JSONL grade file """
+        with open(source_path, mode='r', newline='', encoding='utf-8-sig') as file:
+            if source_path.lower().endswith(('.jsonl', '.json')):
+                for row_number, line in enumerate(file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        yield row_number, [str(record.get(field, '')).strip() for field in GradeService.IMPORT_FIELDS]
+                    except (ValueError, AttributeError):
+                        yield row_number, None
+            else:
+                for row_number, record in enumerate(csv.DictReader(file), start=1):
+                    yield row_number, [(record.get(field) or '').strip() for field in GradeService.IMPORT_FIELDS]
+
+    @staticmethod
+    def import_grades(source_path, batch_size=50000, workers=None):
+        """ Stream grade rows from a CSV or JSONL file and append the valid ones to students.csv.
+
+        Rows are validated in batches (on a process pool when a batch is
+        large) and written through one buffered file handle. The result
+        carries a report with the accepted count, the per-row (row_number,
+        reason) rejects and the throughput.
+        """
+        global concurrent
+        import concurrent.futures
+        start = time.perf_counter()
+        course_ids = {course.course_id for course in Course.load_courses()}
+        ChangeLog.compact('students.csv')  # So plain appends are not shadowed by the log
+
+        accepted_count, rejected, seen, batch = 0, [], set(), []
+        try:
+            with CSVHandler.appender('students.csv') as write_rows, \
+                    concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+
+                def flush_batch():
+                    accepted, batch_rejects = GradeValidator.validate_import_batch(batch, course_ids, seen, executor)
+                    write_rows(accepted)
+                    record_store.append('students.csv', accepted)
+                    rejected.extend(batch_rejects)
+                    batch.clear()
+                    return len(accepted)
+
+                for item in GradeService._read_import_rows(source_path):
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        accepted_count += flush_batch()
+                if batch:
+                    accepted_count += flush_batch()
+        except FileNotFoundError:
+            return Result(False, f"Import file {source_path} not found.")
+
+        elapsed = time.perf_counter() - start
+        total = accepted_count + len(rejected)
+        report = {
+            'accepted': accepted_count,
+            'rejected': rejected,
+            'seconds': elapsed,
+            'rows_per_second': total / elapsed if elapsed else 0.0,
+        }
+        return Result(True, f"Imported {accepted_count} of {total} rows in {elapsed:.2f}s "
+                            f"({report['rows_per_second']:.0f} rows/s).", report)
+
+# Asyncio HTTP/JSON Server
+class GradeServer:
+    """Serves GradeService over HTTP/1.1 with JSON bodies to many clients at once.
+
+    Login returns a session token from a SessionManager; clients send it back
+    as "Authorization: Bearer <token>" and may reconnect freely. A client
+    without a token still gets a session for its keep-alive connection. Reads are
+    answered straight from the shared record store on the event loop.
+    Writes are queued to one writer task and applied in order, so two
+    professors editing at once never interleave inside a change. Password
+    hashing runs in a worker thread so a login does not stall other clients.
+
+        POST   /login       {"email", "password"}
+        POST   /logout
+        GET    /courses, /professors
+        GET    /grades      own grades, or ?course_id= / ?professor= / ?email= for professors
+        GET    /statistics  ?course_id= or ?professor= (professors)
+        GET    /roster      ?course_id=&offset=&limit=, or &count_only=1 (professors)
+        POST   /grades      {"first_name", "last_name", "email", "course_id", "grade", "marks"}
+        PUT    /grades      {"email", "course_id", "grade", "marks"}
+        DELETE /grades      ?email=, optionally &course_id= for one enrollment
+        POST   /grades/delete {"targets": [email or [email, course_id], ...]}
+    """
+    MAX_BODY = 1 << 20
+    REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden',
+               404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+               500: 'Internal Server Error'}
+
+    def __init__(self, host='127.0.0.1', port=8080, sessions=None):
+        global asyncio
+        import asyncio
+        self.host = host
+        self.port = port
+        self.sessions = SessionManager() if sessions is None else sessions
+        self.writes = None  # asyncio.Queue of (operation, args, future), created on the loop
+        self.routes = {
+            ('POST', '/login'): self.login,
+            ('POST', '/logout'): self.logout,
+            ('GET', '/courses'): self.courses,
+            ('GET', '/professors'): self.professors,
+            ('GET', '/grades'): self.grades,
+            ('GET', '/statistics'): self.statistics,
+            ('GET', '/roster'): self.roster,
+            ('POST', '/grades'): self.add_grade,
+            ('PUT', '/grades'): self.update_grade,
+            ('DELETE', '/grades'): self.delete_grade,
+            ('POST', '/grades/delete'): self.delete_grades,
+        }
+
+    # Writes
+    async def _writer(self):
+        while True:
+            operation, args, future = await self.writes.get()
+            try:
+                future.set_result(operation(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def write(self, operation, *args):
+        """ Queue a write for the writer task and wait for its result """
+        future = asyncio.get_running_loop().create_future()
+        await self.writes.put((operation, args, future))
+        return await future
+
+    # Handlers return (status, Result)
+    @staticmethod
+    def _require(session, role=None):
+        user = session.get_user()
+        if user is None:
+            return 401, Result(False, "Log in first.")
+        if role is not None and not isinstance(user, role):
+            return 403, Result(False, f"This functionality is available only for {role.__name__.lower()}s.")
+        return None
+
+    async def login(self, session, query, body):
+        email, password = str(body.get('email', '')), str(body.get('password', ''))
+        # Only the hashing leaves the loop; the store is read here and written by the writer task
+        found = GradeService.credentials(email)
+        if not found.ok:
+            return 401, found
+        row = found.data
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        matches = await loop.run_in_executor(None, LoginUser._password_matches, row[1], password)
+        warning = PasswordHasher.budget_warning((time.perf_counter() - start) * 1000)
+        if warning:
+            print(f"[!] Login of {email}: {warning}")
+        if not matches:
+            return 401, Result(False, "Incorrect password.")
+        if PasswordHasher.needs_rehash(row[1]):
+            hashed = await loop.run_in_executor(None, PasswordHasher.hash, password.strip())
+            await self.write(LoginUser._store_hash, row, hashed)
+        result = GradeService.signed_in(email, row[2])
+        if not result.ok:
+            return 401, result
+        role = 'student' if isinstance(result.data, Student) else 'professor'
+        token = self.sessions.create(result.data)
+        if session.token is not None:
+            self.sessions.end(session.token)  # Logging in again replaces the earlier token
+        # The connection that logged in holds the token too, so /logout on it revokes the token
+        session.set_user(result.data)
+        session.token = token
+        return 200, Result(True, result.message, {'email': result.data.email, 'role': role, 'token': token})
+
+    async def logout(self, session, query, body):
+        if session.token is not None:
+            self.sessions.end(session.token)
+        session.token = None
+        session.clear_user()
+        return 200, Result(True, "Logged out successfully.")
+
+    async def courses(self, session, query, body):
+        return self._require(session) or (200, GradeService.courses())
+
+    async def professors(self, session, query, body):
+        return self._require(session) or (200, GradeService.professors())
+
+    async def grades(self, session, query, body):
+        denied = self._require(session)
+        if denied:
+            return denied
+        user = session.get_user()
+        if isinstance(user, Student):
+            return 200, GradeService.student_grades(user.email)
+        if 'course_id' in query:
+            return 200, GradeService.grades_by_course(query['course_id'])
+        if 'professor' in query:
+            return 200, GradeService.grades_by_professor(query['professor'])
+        if 'email' in query:
+            return 200, GradeService.student_grades(query['email'])
+        return 400, Result(False, "Give course_id, professor or email.")
+
+    async def roster(self, session, query, body):
+        denied = self._require(session, Professor)
+        if denied:
+            return denied
+        course_id = query.get('course_id', '')
+        if query.get('count_only'):
+            return 200, GradeService.roster_count(course_id)
+        try:
+            offset = int(query.get('offset', 0))
+            limit = int(query['limit']) if 'limit' in query else None
+        except ValueError:
+            return 400, Result(False, "offset and limit must be integers.")
+        return 200, GradeService.roster(course_id, offset, limit)
+
+    async def statistics(self, session, query, body):
+        return self._require(session, Professor) or (
+            200, GradeService.statistics(query.get('course_id'), query.get('professor')))
+
+    async def add_grade(self, session, query, body):
+        fields = ['first_name', 'last_name', 'email', 'course_id', 'grade', 'marks']
+        return self._require(session, Professor) or (
+            200, await self.write(GradeService.add_student, *(str(body.get(field, '')) for field in fields)))
+
+    async def update_grade(self, session, query, body):
+        fields = ['email', 'course_id', 'grade', 'marks']
+        return self._require(session, Professor) or (
+            200, await self.write(GradeService.update_student, *(str(body.get(field, '')) for field in fields)))
+
+    async def delete_grade(self, session, query, body):
+        return self._require(session, Professor) or (
+            200, await self.write(GradeService.delete_student, query.get('email', ''), query.get('course_id')))
+
+    async def delete_grades(self, session, query, body):
+        denied = self._require(session, Professor)
+        if denied:
+            return denied
+        targets = body.get('targets')
+        if not isinstance(targets, list):
+            return 400, Result(False, "targets must be a list.")
+        for position, target in enumerate(targets):
+            if isinstance(target, list) and len(target) == 2 and all(isinstance(part, str) for part in target):
+                targets[position] = tuple(target)
+            elif not isinstance(target, str):
+                return 400, Result(False, f"targets[{position}] must be an email or an [email, course_id] pair.")
+        return 200, await self.write(GradeService.delete_students, targets)
+
+    # HTTP
+    @staticmethod
+    def _json_default(value):
+        if dataclasses.is_dataclass(value):
+            return dataclasses.asdict(value)
+        return float(value)  # NumPy scalars from the analytics
+
+    @staticmethod
+    async def _read_request(reader):
+        """ Return (method, path, query, headers, body) or None when the client closed the connection """
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length > GradeServer.MAX_BODY:
+            raise OverflowError
+        body = await reader.readexactly(length) if length else b''
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        return method.upper(), url.path, query, headers, body
+
+    def _response(self, status, result, keep_alive):
+        payload = json.dumps(dataclasses.asdict(result), default=self._json_default).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {self.REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + payload
+
+    async def handle_connection(self, reader, writer):
+        connection_session = Session()  # Used by requests that carry no token
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (ValueError, OverflowError):
+                    writer.write(self._response(400, Result(False, "Malformed request."), False))
+                    break
+                if request is None:
+                    break
+                method, path, query, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                scheme, _, token = headers.get('authorization', '').partition(' ')
+                if scheme.lower() == 'bearer' and token:
+                    session = self.sessions.get(token.strip()) or Session()  # Unknown or expired: logged out
+                else:
+                    session = connection_session
+
+                handler = self.routes.get((method, path))
+                if handler is None:
+                    known = any(route_path == path for _, route_path in self.routes)
+                    status, result = (405, Result(False, "Method not allowed.")) if known else \
+                        (404, Result(False, f"Unknown path {path}."))
+                else:
+                    try:
+                        payload = json.loads(body) if body else {}
+                    except ValueError:
+                        payload = None
+                    if not isinstance(payload, dict):
+                        status, result = 400, Result(False, "The body must be a JSON object.")
+                    else:
+                        try:
+                            status, result = await handler(session, query, payload)
+                        except Exception:
+                            # A bug in one handler answers that request only; the connection stays usable
+                            print(f"[!] {method} {path} failed:\n{traceback.format_exc()}", file=sys.stderr)
+                            status, result = 500, Result(False, "Internal server error.")
+                    if status == 200 and not result.ok:
+                        status = 400
+                writer.write(self._response(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.writes = asyncio.Queue()
+        writer_task = asyncio.create_task(self._writer())
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        try:
+            # Stop cleanly on SIGTERM too, so pending edits are flushed below
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+        except (NotImplementedError, AttributeError):  # Windows event loops
+            pass
+        print(f"[+] Serving Check My Grade on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            writer_task.cancel()
+            student_changes.flush()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\n[+] Server stopped.")
+
+
 # Main Application
 
 class CheckMyGrade:
-    def __init__(self):
-        self.courses_list = Course.load_courses()
-        self.professors_list = Professor.load_professors()
-        self.student_list = Student.load_students()
+    PAGE_SIZE = 20  # Roster rows shown per page
+
+    def __init__(self, profile_startup=False):
+        # The menus read through GradeService, so no tables are parsed before the first prompt
+        self.profile_startup = profile_startup
 
     def start(self):
         while True:
@@ -461,6 +3303,7 @@ class CheckMyGrade:
                     self.register()
                 elif choice == '3':
                     print("Exiting...")
+                    student_changes.flush()
                     break
                 else:
                     print("Invalid choice. Please try again.")
@@ -475,6 +3318,11 @@ class CheckMyGrade:
         print("1. Login")
         print("2. Register")
         print("3. Exit")
+        if self.profile_startup:
+            elapsed_ms = (time.perf_counter() - STARTUP_BEGAN) * 1000
+            loaded = ', '.join(record_store.tables) or 'none'
+            print(f"[profile] Startup to first prompt: {elapsed_ms:.1f} ms (tables loaded: {loaded})")
+            self.profile_startup = False
         choice = input("Enter your choice: ")
         return choice
 
@@ -567,6 +3415,10 @@ class CheckMyGrade:
                 print("9. Logout")
                 print("10. Add Course")
                 print("11. Add Professor")
+                print("12. Course Analytics")
+                print("13. Bulk Import Grades")
+                print("14. Export Grade Report")
+                print("15. Batch Delete Student Records")
             
                 choice = input("Enter your choice: ")
 
@@ -576,32 +3428,29 @@ class CheckMyGrade:
                     self.add_student_record()
                 elif choice == "3":
                     email = input("Enter student's email to delete course for: ")
-                    Professor.delete_student_record(email)
+                    course_id = input("Enter course ID (blank for every course): ").strip()
+                    Professor.delete_student_record(email, course_id=course_id or None)
                 elif choice == "4":
                     email_to_update = input("Enter student's email to update: ")
 
-                    student = None
-
-                    for s in self.student_list:
-                        if s.email == email_to_update:
-                            student = s
-                            break
-
-                    if student is None:
+                    if not GradeService.student_grades(email_to_update).ok:
                         print(f"Student with email {email_to_update} not found.")
                     else:
                         course_to_update = input("Enter course ID to update: ")
                         new_grade = input("Enter new grade: ")
                         new_marks = input("Enter new marks: ")
-                        student.update_student_record(course_to_update, new_grade, new_marks)
+                        GradeService.update_student(email_to_update, course_to_update, new_grade, new_marks).show()
 
                 elif choice == "5":
-                    print("Sorting records...")
-                    # Implement sorting logic here
+                    self.search_time()
                 elif choice == "6": 
                     self.display_grades()
                 elif choice == "7": 
-                    StudentStatistics.display_statistics()
+                    scope = input("Enter course ID or professor email for a breakdown (blank for all): ").strip()
+                    if '@' in scope:
+                        StudentStatistics.display_statistics(professor_email=scope)
+                    else:
+                        StudentStatistics.display_statistics(course_id=scope or None)
                 elif choice == "8":
                     new_password = getpass.getpass("Enter new password: ")
                     LoginUser.change_password(session.get_user().email, new_password)
@@ -612,15 +3461,34 @@ class CheckMyGrade:
                     course_id = input("Enter course ID: ")
                     course_name = input("Enter course name: ")
                     description = input("Course Description: ")
-                    course = Course(course_id, course_name, description)
-                    Course.add_course(self.courses_list, course)
+                    GradeService.add_course(course_id, course_name, description).show()
                 elif choice == '11':
                     name = input("Enter professor name: ")
                     email = input("Enter professor email: ")
                     rank = input("Enter professor rank: ")
                     course_id = input("Enter course ID: ")
-                    professor = Professor(name, email, rank, course_id)
-                    Professor.save_professors([professor])
+                    GradeService.add_professor(name, email, rank, course_id).show()
+                elif choice == '12':
+                    StudentStatistics.display_course_analytics()
+                elif choice == '13':
+                    source_path = input("Enter path of the CSV or JSONL grade file: ")
+                    Professor.import_grades(source_path.strip())
+                elif choice == '14':
+                    scope = input("Group the report by (course/professor/student): ").strip().lower()
+                    key = input(f"Only this {scope} (blank for all): ").strip()
+                    path = input("Output file (.csv, .jsonl or .txt): ").strip()
+                    GradeService.export_report(path, scope, key=key or None).show()
+                elif choice == '15':
+                    source_path = input("Enter path of a file with one email or email,course_id per line: ")
+                    try:
+                        with open(source_path.strip(), newline='', encoding='utf-8-sig') as file:
+                            targets = [row[0].strip() if len(row) == 1 or not row[1].strip()
+                                       else (row[0].strip(), row[1].strip())
+                                       for row in csv.reader(file) if row and row[0].strip()]
+                    except FileNotFoundError:
+                        print(f"[!] File {source_path} not found.")
+                    else:
+                        Professor.delete_student_records(targets)
                 else:
                     print("[!] Invalid choice. Please try again.")   
 
@@ -639,19 +3507,73 @@ class CheckMyGrade:
         
     def view_courses(self):
         """ Display all courses available """
-        if not self.courses_list:
+        courses = GradeService.courses().data
+        if not courses:
             print("No courses available.")
         print("\n--- Available Courses ---")
-        for course in self.courses_list:
-            course.display_course()
+        for course in courses:
+            print(f"{course.course_id}: {course.course_name} - {course.description}")
    
     def view_professors(self):
         """ Display all professors available """
-        if not self.professors_list:
+        professors = GradeService.professors().data
+        if not professors:
             print("No professors available.")
         print("\n--- Available Professors ---")
-        for professor in self.professors_list:
-            professor.display_professor() 
+        for professor in professors:
+            print(f"Professor: {professor.name}, Email: {professor.email}, "
+                  f"Rank: {professor.rank}, Courses: {', '.join(professor.course_ids)}")
+
+    def search_time(self):
+        """ Timed sorting and searching over the student records """
+        print("\n--- Search Time ---")
+        print("1. Sort by Marks")
+        print("2. Sort by Name")
+        print("3. Sort by Email")
+        print("4. Search by Email")
+        print("5. Search by Name Prefix")
+        print("6. Search by Course ID")
+        print("7. Compare with Linear Scan (synthetic data)")
+        choice = input("Enter your choice (1-7): ")
+
+        if choice == "7":
+            sizes = input("Dataset sizes (comma-separated, blank for 10000,100000,1000000): ").strip()
+            if sizes:
+                try:
+                    sizes = [int(size) for size in sizes.split(',')]
+                except ValueError:
+                    print("[!] Invalid sizes.")
+                    return
+                if min(sizes) <= 0:
+                    print("[!] Invalid sizes.")
+                    return
+                SearchEngine.compare_with_linear_scan(sizes)
+            else:
+                SearchEngine.compare_with_linear_scan()
+            return
+
+        # Indexes are built by the first search that needs them and reused after that
+        engine = SearchEngine.for_store()
+        if choice in ("1", "2", "3"):
+            field = {"1": "marks", "2": "name", "3": "email"}[choice]
+            results = SearchEngine.timed(f"Sort by {field}", engine.sort_by, field)
+        elif choice == "4":
+            email = input("Enter email: ").strip()
+            results = SearchEngine.timed("Search by email", engine.search_email, email)
+        elif choice == "5":
+            prefix = input("Enter name prefix: ").strip()
+            results = SearchEngine.timed("Search by name prefix", engine.search_name_prefix, prefix)
+        elif choice == "6":
+            course_id = input("Enter course ID: ").strip()
+            results = SearchEngine.timed("Search by course ID", engine.search_course, course_id)
+        else:
+            print("Invalid choice.")
+            return
+
+        for first_name, last_name, email, course_id, grade, marks in results[:20]:
+            print(f"{first_name} {last_name} ({email}) - {course_id}: Grade = {grade}, Marks = {marks}")
+        if len(results) > 20:
+            print(f"... and {len(results) - 20} more.")
 
     def view_students_by_course(self):
         """ View the list of students enrolled in a specific course """
@@ -660,17 +3582,29 @@ class CheckMyGrade:
             return
 
         if isinstance(session.get_user(), Professor):
-            professor = session.get_user()
             print("\n--- View Students List by Course ---")
             course_id = input("Enter the course ID: ")
 
-            enrolled_students = professor.get_students_by_course(course_id)
-            if enrolled_students:
-                print(f"\n--- Students enrolled in {course_id} ---")
-                for student in enrolled_students:
-                    print(student)
-            else:
-                print(f"[!] No students found for course {course_id}.")
+            offset = 0
+            while True:
+                result = GradeService.roster(course_id, offset, self.PAGE_SIZE)
+                if not result.ok:
+                    print(f"[!] No students found for course {course_id}.")
+                    break
+                page = result.data
+                last = min(offset + self.PAGE_SIZE, page.total)
+                print(f"\n--- Students enrolled in {course_id} ({offset + 1}-{last} of {page.total}) ---")
+                for record in page.records:
+                    print(f"{record.first_name} {record.last_name} - {record.email}")
+                if page.total <= self.PAGE_SIZE:
+                    break
+                move = input("[n]ext page, [p]revious page or [q]uit: ").strip().lower()
+                if move == 'n' and last < page.total:
+                    offset += self.PAGE_SIZE
+                elif move == 'p' and offset:
+                    offset -= self.PAGE_SIZE
+                elif move == 'q':
+                    break
         else:
             print("[!] This functionality is available only for professors.")  
 
@@ -681,7 +3615,6 @@ class CheckMyGrade:
             return
 
         if isinstance(session.get_user(), Professor):
-            professor = session.get_user()
             print("\n--- Add Student Record ---")
             first_name = input("Enter student's first name: ")
             last_name = input("Enter student's last name: ")
@@ -691,7 +3624,7 @@ class CheckMyGrade:
             marks = input("Enter marks: ")
 
             # Add student to the course
-            Professor.add_student_to_course(first_name, last_name, email, course_id, grade, marks)
+            GradeService.add_student(first_name, last_name, email, course_id, grade, marks).show()
         else:
             print("[!] This functionality is available only for professors.")
 
@@ -705,46 +3638,32 @@ class CheckMyGrade:
         if choice == "1":
             course_id = input("Enter course ID: ")
             print(f"\n--- Grades for Course: {course_id} ---")
-            found = False
-            for student in self.student_list:
-                if course_id in student.courses:
-                    grade = student.courses[course_id]['grade']
-                    marks = student.courses[course_id]['marks']
-                    print(f"{student.first_name} {student.last_name} ({student.email}): Grade = {grade}, Marks = {marks}")
-                    found = True
-            if not found:
+            result = GradeService.grades_by_course(course_id)
+            for record in result.data:
+                print(f"{record.first_name} {record.last_name} ({record.email}): "
+                      f"Grade = {record.grade}, Marks = {record.marks}")
+            if not result.ok:
                 print("No records found for this course.")
 
         elif choice == "2":
             prof_email = input("Enter professor's email: ")
-
-            prof_courses = [
-                prof.course_id for prof in self.professors_list if prof.email == prof_email
-            ]
-
-            if not prof_courses:
-                print("No professor found with email {prof_email}.")
-                return
-            
-            print(f"\n--- Grades for Courses taught by {prof_email} ---")
-            found = False
-            for student in self.student_list:
-                for course_id in student.courses:
-                    if course_id in student.courses:
-                        grade = student.courses[course_id]['grade']
-                        marks = student.courses[course_id]['marks']
-                        print(f"{student.first_name} {student.last_name} ({student.email}) - {course_id}: Grade = {grade}, Marks = {marks}")
-                        found = True
-            if not found:
-                print("No student grades found for this professor.")
+            result = GradeService.grades_by_professor(prof_email)
+            if result.ok:
+                print(f"\n--- Grades for Courses taught by {prof_email} ---")
+                for record in result.data:
+                    print(f"{record.first_name} {record.last_name} ({record.email}) - {record.course_id}: "
+                          f"Grade = {record.grade}, Marks = {record.marks}")
+            else:
+                print(result.message)
 
         elif choice == "3":
             student_email = input("Enter student email: ")
-            student = next((s for s in self.student_list if s.email == student_email), None)
-            if student:
-                print(f"\n--- Grades for Student: {student.first_name} {student.last_name} ({student.email}) ---")
-                for course_id, data in student.courses.items():
-                    print(f"{course_id}: Grade = {data['grade']}, Marks = {data['marks']}")
+            result = GradeService.student_grades(student_email)
+            if result.ok:
+                first = result.data[0]
+                print(f"\n--- Grades for Student: {first.first_name} {first.last_name} ({first.email}) ---")
+                for record in result.data:
+                    print(f"{record.course_id}: Grade = {record.grade}, Marks = {record.marks}")
             else:
                 print("Student not found.")
         else:
@@ -752,6 +3671,9 @@ class CheckMyGrade:
 
     def logout(self):
         """ Log out the current user """
+        saved = student_changes.flush()
+        if saved:
+            print(f"[+] Saved {saved} pending record change(s).")
         if session.get_user():
             print(f"[+] Logged out successfully. Goodbye, {session.get_user().email}.")
             session.clear_user()
@@ -761,7 +3683,62 @@ class CheckMyGrade:
 
 
 if __name__ == "__main__":
-    app = CheckMyGrade()
-    app.start()
+    parser = argparse.ArgumentParser(description="Check My Grade Application")
+    parser.add_argument('--rotate-key', nargs=2, type=int, metavar=('OLD', 'NEW'),
+                        help="re-encrypt legacy passwords in login.csv from shift OLD to shift NEW and exit")
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv',
+                        help="store the tables in CSV files (default) or in a SQLite database")
+    parser.add_argument('--db', default='checkmygrade.db', help="SQLite database file (default: checkmygrade.db)")
+    parser.add_argument('--migrate-sqlite', action='store_true',
+                        help="copy the CSV files into the SQLite database and exit")
+    parser.add_argument('--data-dir', help="folder holding the CSV files (default: this script's folder)")
+    parser.add_argument('--export', nargs=2, metavar=('SCOPE', 'PATH'),
+                        help="write a grade report grouped by course, professor or student to PATH "
+                             "(.csv, .jsonl or .txt) and exit")
+    parser.add_argument('--serve', action='store_true',
+                        help="serve the application over HTTP/JSON instead of the terminal menu")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --serve (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="port for --serve (default: 8080)")
+    parser.add_argument('--session-ttl', type=float, default=1800.0,
+                        help="seconds an idle --serve session stays valid (default: 1800)")
+    parser.add_argument('--max-sessions', type=int, default=10_000,
+                        help="live --serve sessions kept before the least recently used is evicted")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="report the time from launch to the first prompt")
+    parser.add_argument('--login-budget-ms', type=float,
+                        help="time one login's password hash may take before a warning "
+                             "(default: the calibrated budget, else 100)")
+    parser.add_argument('--calibrate', action='store_true',
+                        help="set the password hash cost to fit the login budget on this machine and save it")
+    args = parser.parse_args()
+    CSVHandler.data_dir = args.data_dir
+    PasswordHasher.load_cost()
+    if args.login_budget_ms:
+        PasswordHasher.LOGIN_BUDGET_MS = args.login_budget_ms
+    if args.calibrate:
+        iterations = PasswordHasher.calibrate()
+        PasswordHasher.save_cost()
+        print(f"[+] Password hashing calibrated to {iterations} iterations "
+              f"for a {PasswordHasher.LOGIN_BUDGET_MS:.0f} ms login budget; saved to {PasswordHasher.SETTINGS}.")
+
+    if args.migrate_sqlite:
+        for filename, count in SQLiteBackend(args.db).migrate_from_csv().items():
+            print(f"[+] Migrated {count} row(s) from {filename}.")
+        raise SystemExit
+    if args.backend == 'sqlite':
+        CSVHandler.use_backend(SQLiteBackend(args.db))
+
+    if args.rotate_key:
+        old_shift, new_shift = args.rotate_key
+        count = LoginUser.rotate_key(old_shift, new_shift)
+        print(f"[+] Rotated {count} password(s). Run with CHECKMYGRADE_SHIFT={new_shift} from now on.")
+    elif args.export:
+        scope, path = args.export
+        GradeService.export_report(path, scope).show()
+    elif args.serve:
+        GradeServer(args.host, args.port, SessionManager(args.session_ttl, args.max_sessions)).run()
+    else:
+        app = CheckMyGrade(profile_startup=args.profile_startup)
+        app.start()
 
 
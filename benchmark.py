@@ -0,0 +1,352 @@
+"""Benchmark harness for the Check My Grade application.
+
+Generates synthetic students/courses/professors/login CSV files at the
+requested sizes, drives each menu operation without a terminal and prints
+latency percentiles, throughput and peak allocation per operation (plus the
+process's peak RSS per run) as JSON, so runs from different commits can be
+compared.
+
+    python benchmark.py --sizes 1000,100000 --iterations 50 --output bench.json
+"""
+import argparse
+import builtins
+import concurrent.futures
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is reported as null there
+    resource = None
+
+import Uthayan_Lab1_v2 as app
+
+
+class BenchmarkHarness:
+    """Runs every operation against one synthetic dataset and collects timings."""
+
+    def __init__(self, directory, enrollments, iterations, hash_iterations, seed=1):
+        self.directory = directory
+        self.enrollments = enrollments
+        self.iterations = iterations
+        self.rng = random.Random(seed)
+
+        app.PasswordHasher.ITERATIONS = hash_iterations
+        start = time.perf_counter()
+        self.dataset = app.SyntheticData.write_dataset(directory, enrollments)
+        self.generate_seconds = time.perf_counter() - start
+
+        # Point the application at the synthetic files and drop anything cached
+        app.CSVHandler.data_dir = directory
+        app.record_store.invalidate()
+
+    @staticmethod
+    def peak_rss_mb():
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+    @staticmethod
+    @contextlib.contextmanager
+    def scripted_input(answers):
+        """Answer input() prompts from a list instead of the terminal."""
+        replies = iter(answers)
+        original = builtins.input
+        builtins.input = lambda prompt='': next(replies)
+        try:
+            yield
+        finally:
+            builtins.input = original
+
+    @staticmethod
+    def percentile(sorted_values, q):
+        position = (len(sorted_values) - 1) * q / 100
+        low = int(position)
+        high = min(low + 1, len(sorted_values) - 1)
+        return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+    def measure(self, operation, make_args):
+        """Time one cold call and `iterations` warm calls of operation(*make_args()).
+
+        One more call runs under tracemalloc afterwards for the operation's own
+        peak allocation, so tracing does not slow the timed calls.
+        """
+        latencies = []
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            operation(*make_args())
+            cold_ms = (time.perf_counter() - start) * 1000
+            for _ in range(self.iterations):
+                args = make_args()
+                start = time.perf_counter()
+                operation(*args)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            args = make_args()
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                operation(*args)
+                peak_alloc = tracemalloc.get_traced_memory()[1] - baseline
+            finally:
+                tracemalloc.stop()
+
+        latencies.sort()
+        total_seconds = sum(latencies) / 1000
+        return {
+            'cold_ms': cold_ms,
+            'p50_ms': self.percentile(latencies, 50),
+            'p90_ms': self.percentile(latencies, 90),
+            'p99_ms': self.percentile(latencies, 99),
+            'max_ms': latencies[-1],
+            'ops_per_second': len(latencies) / total_seconds if total_seconds else None,
+            'peak_alloc_mb': peak_alloc / (1024 * 1024),
+        }
+
+    # Operations
+    def random_student(self):
+        return self.rng.choice(self.dataset['student_emails'])
+
+    def random_course(self):
+        return self.rng.choice(self.dataset['course_ids'])
+
+    def login(self, email):
+        app.LoginUser.login_user(email, self.dataset['password'])
+
+    def view_grades(self, email):
+        student = app.Student('Bench', 'User', email)
+        app.session.set_user(student)
+        student.view_grades()
+        app.session.clear_user()
+
+    def display_grades(self, checkmygrade, choice, value):
+        with self.scripted_input([choice, value]):
+            checkmygrade.display_grades()
+
+    def get_students_by_course(self, course_id):
+        app.Professor('Bench', 'bench@sjsu.edu', 'Professor', course_id).get_students_by_course(course_id)
+
+    @staticmethod
+    def _write_worker(directory, worker, writes):
+        """ One writer process: log grade updates and return its latencies and lock waits """
+        app.CSVHandler.data_dir = directory
+        rows = app.record_store.rows('students.csv')
+        app.FileLock.reset_stats()  # Count only the writes
+        rng = random.Random(worker)
+        latencies = []
+        for _ in range(writes):
+            row = list(rng.choice(rows))
+            row[5] = str(rng.randint(0, 100))
+            start = time.perf_counter()
+            app.CSVHandler.apply_changes('students.csv', [('update', row)])
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies, app.FileLock.stats().get('students.csv')
+
+    def measure_write_contention(self, writers, writes=200):
+        """ Time logged updates from `writers` processes hitting students.csv at once """
+        with concurrent.futures.ProcessPoolExecutor(max_workers=writers) as executor:
+            results = list(executor.map(self._write_worker, [self.directory] * writers,
+                                        range(writers), [writes] * writers))
+        latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+        locks = [stats for _, stats in results if stats]
+        acquired = sum(stats['acquired'] for stats in locks)
+        return {
+            'writers': writers,
+            'p50_ms': self.percentile(latencies, 50),
+            'p99_ms': self.percentile(latencies, 99),
+            'max_ms': latencies[-1],
+            'lock_contended': sum(stats['contended'] for stats in locks) / acquired if acquired else 0.0,
+            'lock_mean_wait_ms': sum(stats['mean_wait_ms'] * stats['acquired'] for stats in locks) / acquired
+                                 if acquired else 0.0,
+            'lock_max_wait_ms': max((stats['max_wait_ms'] for stats in locks), default=0.0),
+        }
+
+    @staticmethod
+    def traced_mb(build):
+        """ Memory still allocated by the object build() returns, in MiB """
+        tracemalloc.start()
+        try:
+            kept = build()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del kept
+        return size / (1024 * 1024)
+
+    @staticmethod
+    def dict_backed_students(rows):
+        """ The old layout: one __dict__ object per student with a dict of dicts of enrollments """
+        class DictStudent:
+            def __init__(self, first_name, last_name, email):
+                self.first_name = first_name
+                self.last_name = last_name
+                self.email = email
+                self.courses = {}
+
+        students = {}
+        for first_name, last_name, email, course_id, grade, marks in rows:
+            if email not in students:
+                students[email] = DictStudent(first_name, last_name, email)
+            students[email].courses[course_id] = {'grade': grade, 'marks': marks}
+        return list(students.values())
+
+    @staticmethod
+    def loaded_students():
+        """ Load students.csv into the record store from scratch and return what it keeps """
+        app.record_store.invalidate('students.csv')
+        app.record_store.rows('students.csv')
+        return app.record_store.tables['students.csv'], app.record_store.indexes['students.csv']
+
+    def measure_record_memory(self):
+        """ tracemalloc size of students.csv as the record store holds it (rows and indexes), and of the
+        Student objects built from it, old layout against slotted arrays """
+        record_store_mb = self.traced_mb(self.loaded_students)
+        rows = [list(row) for row in app.record_store.rows('students.csv')]  # Fresh strings, as a parse makes them
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return {
+                'record_store_mb': record_store_mb,
+                'dict_backed_mb': self.traced_mb(lambda: self.dict_backed_students(rows)),
+                'slotted_mb': self.traced_mb(lambda: app.Student.load_students()),
+            }
+
+    def measure_offset_index(self):
+        """ Sidecar build, reopen and one-student lookup through OffsetIndex against loading the table """
+        app.record_store.invalidate('students.csv')
+        path = app.CSVHandler.get_file_path('students.csv') + app.OffsetIndex.SUFFIX
+        if os.path.exists(path):
+            os.remove(path)
+        start = time.perf_counter()
+        app.OffsetIndex('students.csv').find('email', self.random_student())
+        build_ms = (time.perf_counter() - start) * 1000
+        index = app.OffsetIndex('students.csv')  # A fresh process maps the sidecar it finds
+        start = time.perf_counter()
+        index.find('email', self.random_student())
+        reopen_ms = (time.perf_counter() - start) * 1000
+        lookups = []
+        for _ in range(self.iterations):
+            email = self.random_student()
+            start = time.perf_counter()
+            index.find('email', email)
+            lookups.append((time.perf_counter() - start) * 1000)
+        lookups.sort()
+        start = time.perf_counter()
+        app.record_store.rows('students.csv')
+        return {
+            'build_ms': build_ms,
+            'reopen_ms': reopen_ms,
+            'lookup_p50_ms': self.percentile(lookups, 50),
+            'lookup_p99_ms': self.percentile(lookups, 99),
+            'full_load_ms': (time.perf_counter() - start) * 1000,
+        }
+
+    def run(self, writers=4):
+        checkmygrade = app.CheckMyGrade()
+        # Each delete needs a student that is still there
+        deletable = iter(reversed(self.dataset['student_emails']))
+        delete_batch = 4
+        operations = {
+            'login_user': (self.login, lambda: (self.random_student(),)),
+            'view_grades': (self.view_grades, lambda: (self.random_student(),)),
+            'display_grades_by_course': (self.display_grades, lambda: (checkmygrade, '1', self.random_course())),
+            'display_grades_by_professor': (self.display_grades, lambda: (
+                checkmygrade, '2', self.rng.choice(self.dataset['professor_emails']))),
+            'display_grades_by_student': (self.display_grades, lambda: (checkmygrade, '3', self.random_student())),
+            'get_students_by_course': (self.get_students_by_course, lambda: (self.random_course(),)),
+            'display_statistics': (app.StudentStatistics.display_statistics, lambda: ()),
+            # The same reads through the headless service layer, without the terminal I/O
+            'service_grades_by_course': (app.GradeService.grades_by_course, lambda: (self.random_course(),)),
+            'service_grades_by_professor': (app.GradeService.grades_by_professor, lambda: (
+                self.rng.choice(self.dataset['professor_emails']),)),
+            'service_student_grades': (app.GradeService.student_grades, lambda: (self.random_student(),)),
+            'service_statistics': (app.GradeService.statistics, lambda: ()),
+            'delete_student_record': (app.Professor.delete_student_record, lambda: (next(deletable),)),
+            f'service_delete_students_x{delete_batch}': (app.GradeService.delete_students, lambda: (
+                [next(deletable) for _ in range(delete_batch)],)),
+        }
+        # Students each delete operation uses up: one cold, `iterations` warm and one traced call
+        deletes_needed = {'delete_student_record': self.iterations + 2,
+                          f'service_delete_students_x{delete_batch}': (self.iterations + 2) * delete_batch}
+        remaining = len(self.dataset['student_emails'])
+        results = {}
+        for name, (operation, make_args) in operations.items():
+            if name in deletes_needed:
+                if deletes_needed[name] > remaining:
+                    results[name] = {'skipped': f"needs {deletes_needed[name]} students, "
+                                                f"{remaining} are left to delete"}
+                    continue
+                remaining -= deletes_needed[name]
+            results[name] = self.measure(operation, make_args)
+        app.student_changes.flush()
+        # Lock latency with one writer (uncontended) and with several at once
+        contention = [self.measure_write_contention(count) for count in sorted({1, writers})]
+        memory = self.measure_record_memory()
+        offset_index = self.measure_offset_index()
+        app.record_store.invalidate()
+        return {
+            'enrollments': self.enrollments,
+            'students': self.dataset['students'],
+            'courses': self.dataset['courses'],
+            'generate_seconds': self.generate_seconds,
+            'iterations': self.iterations,
+            'operations': results,
+            'write_contention': contention,
+            'student_records': memory,
+            'peak_rss_mb': self.peak_rss_mb(),  # Whole process, so it only ever rises across runs
+            'offset_index': offset_index,
+            'record_store_cache': {key: value for key, value in app.record_store.cache_stats().items()
+                                   if key in ('hits', 'misses')},
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.realpath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Check My Grade operations on synthetic data.")
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help="comma-separated enrollment counts, e.g. 1000,100000,10000000")
+    parser.add_argument('--iterations', type=int, default=50, help="warm calls per operation")
+    parser.add_argument('--hash-iterations', type=int, default=10_000,
+                        help="PBKDF2 iterations for the synthetic logins")
+    parser.add_argument('--writers', type=int, default=4,
+                        help="concurrent writer processes for the lock contention measurement")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    for size in (int(size) for size in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory(prefix='checkmygrade-bench-') as directory:
+            harness = BenchmarkHarness(directory, size, args.iterations, args.hash_iterations)
+            report['runs'].append(harness.run(args.writers))
+            print(f"[bench] {size} enrollments done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
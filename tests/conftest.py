@@ -0,0 +1,32 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Uthayan_Lab1_v2 as app  # noqa: E402
+
+TABLES = ('students.csv', 'courses.csv', 'professors.csv', 'login.csv')
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A private copy of the sample tables, with the application pointed at it."""
+    for filename in TABLES:
+        shutil.copy(os.path.join(ROOT, filename), tmp_path / filename)
+    monkeypatch.setattr(app.CSVHandler, 'data_dir', str(tmp_path))
+    monkeypatch.setattr(app.PasswordHasher, 'ITERATIONS', 1000)
+    monkeypatch.setattr(app.PasswordHasher, 'LOGIN_BUDGET_MS', app.PasswordHasher.LOGIN_BUDGET_MS)
+    app.record_store.invalidate()
+    yield tmp_path
+    app.student_changes.flush()
+    app.record_store.invalidate()
+
+
+def append_line(path, line):
+    """Edit a table the way another program would: behind the application's back."""
+    with open(path, 'a', newline='', encoding='utf-8') as file:
+        file.write(line + '\n')
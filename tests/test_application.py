@@ -0,0 +1,8 @@
+from conftest import app
+
+
+def test_menus_do_not_register_with_the_record_store():
+    listeners = list(app.record_store.listeners)
+    for _ in range(3):
+        app.CheckMyGrade()
+    assert app.record_store.listeners == listeners
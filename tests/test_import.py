@@ -0,0 +1,22 @@
+import json
+
+from conftest import app
+
+
+def test_import_accepts_valid_rows_and_reports_rejects(data_dir):
+    existing = app.record_store.rows('students.csv')[0]
+    source = data_dir / 'grades.jsonl'
+    records = [
+        {'first_name': 'Eve', 'last_name': 'Stone', 'email': 'eve@sjsu', 'course_id': existing[3],
+         'grade': 'A', 'marks': '95'},
+        {'first_name': 'Eve', 'last_name': 'Stone', 'email': 'eve@sjsu', 'course_id': existing[3],
+         'grade': 'A', 'marks': '95'},
+        dict(zip(app.GradeService.IMPORT_FIELDS, existing)),
+    ]
+    source.write_text('\n'.join(json.dumps(record) for record in records) + '\nnot json\n')
+
+    result = app.GradeService.import_grades(str(source), batch_size=2, workers=1)
+    assert result.ok
+    assert result.data['accepted'] == 1
+    assert [row_number for row_number, _ in result.data['rejected']] == [2, 3, 4]
+    assert app.GradeValidator.is_enrolled('eve@sjsu', existing[3])
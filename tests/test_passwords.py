@@ -0,0 +1,42 @@
+from conftest import app
+
+PasswordHasher = app.PasswordHasher
+
+
+def test_only_weaker_hashes_are_redone(data_dir):
+    weaker = PasswordHasher.hash('secret', iterations=500)
+    current = PasswordHasher.hash('secret')
+    stronger = PasswordHasher.hash('secret', iterations=4000)
+    assert PasswordHasher.needs_rehash('legacy')
+    assert PasswordHasher.needs_rehash(weaker)
+    assert not PasswordHasher.needs_rehash(current)
+    # A hash made after a calibration on a faster machine is never downgraded
+    assert not PasswordHasher.needs_rehash(stronger)
+    assert PasswordHasher.verify('secret', stronger)
+
+
+def test_calibration_lands_on_the_ladder_and_repeats():
+    original = PasswordHasher.ITERATIONS
+    try:
+        first = PasswordHasher.calibrate(budget_ms=20, sample_iterations=2000)
+        second = PasswordHasher.calibrate(budget_ms=20, sample_iterations=2000)
+    finally:
+        PasswordHasher.ITERATIONS = original
+    for iterations in (first, second):
+        assert iterations % 10_000 == 0
+        rung = iterations // 10_000
+        assert rung & (rung - 1) == 0
+    assert max(first, second) <= 2 * min(first, second)
+
+
+def test_saved_cost_is_loaded_on_the_next_start(data_dir):
+    assert not PasswordHasher.load_cost()
+    PasswordHasher.ITERATIONS = 2000
+    PasswordHasher.LOGIN_BUDGET_MS = 40.0
+    PasswordHasher.save_cost()
+
+    PasswordHasher.ITERATIONS = 1000
+    PasswordHasher.LOGIN_BUDGET_MS = 100.0
+    assert PasswordHasher.load_cost()
+    assert PasswordHasher.ITERATIONS == 2000
+    assert PasswordHasher.LOGIN_BUDGET_MS == 40.0
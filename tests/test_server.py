@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from conftest import app
+
+
+async def request(port, method, path, body=None, token=None, connection=None):
+    """Send one keep-alive request, on connection if given, and return (status, payload, connection)."""
+    reader, writer = connection or await asyncio.open_connection('127.0.0.1', port)
+    data = json.dumps(body).encode() if body is not None else b''
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n"
+    if token:
+        head += f"Authorization: Bearer {token}\r\n"
+    writer.write(head.encode() + b"\r\n" + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length)), (reader, writer)
+
+
+def run_with_server(scenario):
+    """Run scenario(port) against a GradeServer on a free local port."""
+    async def main():
+        server = app.GradeServer('127.0.0.1', 0)
+        server.writes = asyncio.Queue()
+        writer_task = asyncio.create_task(server._writer())
+        listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+        try:
+            return await scenario(listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+            writer_task.cancel()
+    return asyncio.run(main())
+
+
+PROFESSOR = {'email': 'john.smith@sjsu', 'password': 'smith'}
+
+
+def test_logout_on_the_login_connection_revokes_the_token(data_dir):
+    async def scenario(port):
+        status, payload, connection = await request(port, 'POST', '/login', PROFESSOR)
+        assert status == 200
+        token = payload['data']['token']
+        status, _, _ = await request(port, 'GET', '/grades?course_id=CS101', token=token)
+        assert status == 200
+
+        status, _, connection = await request(port, 'POST', '/logout', connection=connection)
+        assert status == 200
+        status, _, _ = await request(port, 'GET', '/grades?course_id=CS101', connection=connection)
+        assert status == 401
+        status, _, _ = await request(port, 'GET', '/grades?course_id=CS101', token=token)
+        assert status == 401
+    run_with_server(scenario)
+
+
+def test_logout_with_the_token_ends_it_everywhere(data_dir):
+    async def scenario(port):
+        _, payload, _ = await request(port, 'POST', '/login', PROFESSOR)
+        token = payload['data']['token']
+        status, _, _ = await request(port, 'POST', '/logout', token=token)
+        assert status == 200
+        status, _, _ = await request(port, 'GET', '/grades?course_id=CS101', token=token)
+        assert status == 401
+    run_with_server(scenario)
+
+
+def test_second_login_replaces_the_first_token(data_dir):
+    async def scenario(port):
+        _, first, connection = await request(port, 'POST', '/login', PROFESSOR)
+        _, second, connection = await request(port, 'POST', '/login', PROFESSOR, connection=connection)
+        assert (await request(port, 'GET', '/courses', token=first['data']['token']))[0] == 401
+        assert (await request(port, 'GET', '/courses', token=second['data']['token']))[0] == 200
+    run_with_server(scenario)
+
+
+def test_bad_password_is_rejected(data_dir):
+    async def scenario(port):
+        status, payload, _ = await request(port, 'POST', '/login', {'email': 'john.smith@sjsu', 'password': 'x'})
+        assert status == 401 and not payload['ok']
+    run_with_server(scenario)
+
+
+def test_a_failing_handler_answers_500_and_keeps_the_connection(data_dir, monkeypatch, capsys):
+    def broken(*args, **kwargs):
+        raise KeyError('boom')
+    monkeypatch.setattr(app.GradeService, 'courses', broken)
+
+    async def scenario(port):
+        status, _, connection = await request(port, 'POST', '/login', PROFESSOR)
+        assert status == 200
+        status, payload, connection = await request(port, 'GET', '/courses', connection=connection)
+        assert status == 500
+        assert not payload['ok']
+        status, _, _ = await request(port, 'GET', '/professors', connection=connection)
+        assert status == 200
+        status, _, _ = await request(port, 'POST', '/login', [1, 2], connection=connection)
+        assert status == 400
+    run_with_server(scenario)
+    assert 'KeyError' in capsys.readouterr().err
@@ -0,0 +1,35 @@
+from conftest import app, append_line
+
+
+def test_statistics_follow_external_edits(data_dir):
+    before = app.GradeService.statistics()
+    assert before.ok
+
+    # Another program adds a professor and a student's mark; the next call must
+    # rebuild from both files without tripping over its own reset
+    append_line(data_dir / 'professors.csv', 'Ada Byron,ada@sjsu,Professor,CS101')
+    append_line(data_dir / 'students.csv', 'Eve,Stone,eve@sjsu,CS101,A,100')
+
+    after = app.GradeService.statistics()
+    assert after.ok
+    assert after.data.count == before.data.count + 1
+    assert after.data.highest == 100
+
+    ada = app.GradeService.statistics(professor_email='ada@sjsu')
+    assert ada.ok
+    assert ada.data.count == len(app.record_store.lookup('students.csv', 'course_id', 'CS101'))
+
+
+def test_professor_added_after_build_is_counted(data_dir):
+    assert app.GradeService.statistics().ok
+    append_line(data_dir / 'professors.csv', 'Ada Byron,ada@sjsu,Professor,CS102')
+    assert app.GradeService.statistics(professor_email='ada@sjsu').ok
+
+
+def test_statistics_follow_in_process_writes(data_dir):
+    count = app.GradeService.statistics().data.count
+    assert app.GradeService.add_student('Eve', 'Stone', 'eve@sjsu', 'CS102', 'F', '10').ok
+    assert app.GradeService.statistics().data.count == count + 1
+    assert app.GradeService.statistics().data.lowest == 10
+    assert app.GradeService.delete_student('eve@sjsu').ok
+    assert app.GradeService.statistics().data.count == count
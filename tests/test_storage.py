@@ -0,0 +1,98 @@
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import shutil
+
+from conftest import app, append_line
+
+WRITERS = 4
+ROWS_PER_WRITER = 300
+
+
+def student_row(writer, number):
+    return ['Load', f'Writer{writer}', f'w{writer}.{number}@sjsu', 'CS101', 'B', '70']
+
+
+def write_rows(data_dir, writer):
+    """Run in a child process: alternate plain appends with logged inserts and updates."""
+    app.CSVHandler.data_dir = data_dir
+    app.ChangeLog.COMPACT_BYTES = 1024  # Compact many times while the other writers run
+    for number in range(ROWS_PER_WRITER):
+        row = student_row(writer, number)
+        if number % 3 == 0:
+            app.CSVHandler.write_csv('students.csv', [row], quiet=True)
+        else:
+            app.CSVHandler.apply_changes('students.csv', [('insert', row)])
+        if number % 5 == 0:
+            app.CSVHandler.apply_changes('students.csv', [('update', row[:4] + ['A', '95'])])
+    app.ChangeLog.compact('students.csv')  # Wait for any compaction this process still owes
+
+
+def keyed(rows):
+    return {(row[2], row[3]): row for row in rows if len(row) == 6}
+
+
+def test_concurrent_writers_with_compaction_lose_nothing(data_dir):
+    before = len(app.record_store.rows('students.csv'))
+    context = multiprocessing.get_context('fork')
+    with concurrent.futures.ProcessPoolExecutor(WRITERS, mp_context=context) as pool:
+        for done in [pool.submit(write_rows, str(data_dir), writer) for writer in range(WRITERS)]:
+            done.result()
+
+    rows = app.record_store.rows('students.csv')
+    assert len(rows) == before + WRITERS * ROWS_PER_WRITER
+    current = keyed(rows)
+    assert len(current) == len(rows)  # No row was written twice
+    for writer in range(WRITERS):
+        for number in range(ROWS_PER_WRITER):
+            row = current[(f'w{writer}.{number}@sjsu', 'CS101')]
+            assert row[4:] == (['A', '95'] if number % 5 == 0 else ['B', '70'])
+
+    app.ChangeLog.compact('students.csv')
+    assert not app.ChangeLog.has_pending('students.csv')
+    assert keyed(app.CSVHandler.read_csv('students.csv')[1:]) == current  # Now from the CSV alone
+
+
+def test_log_replays_after_a_crash(data_dir):
+    first, second = app.record_store.rows('students.csv')[:2]
+    log_path = app.ChangeLog.log_path('students.csv')
+    with open(log_path, 'w', encoding='utf-8') as log:
+        log.write(json.dumps({'op': 'update', 'row': first[:4] + ['C', '55']}) + '\n')
+        log.write(json.dumps({'op': 'delete', 'row': second}) + '\n')
+        log.write(json.dumps({'op': 'insert', 'row': ['Eve', 'Stone', 'eve@sjsu', 'CS101', 'A', '99']}) + '\n')
+        log.write('{"op": "insert", "row": ["Torn')  # The process died mid-write
+
+    # A fresh start sees the logged changes and skips the torn record
+    app.record_store.invalidate()
+    current = keyed(app.record_store.rows('students.csv'))
+    assert current[(first[2], first[3])][4:] == ['C', '55']
+    assert (second[2], second[3]) not in current
+    assert current[('eve@sjsu', 'CS101')][5] == '99'
+
+    # A crash after compaction replaced the CSV but before it removed the log replays the same log twice
+    shutil.copy(log_path, str(data_dir / 'saved.log'))
+    app.ChangeLog.compact('students.csv')
+    assert not os.path.exists(log_path)
+    shutil.copy(str(data_dir / 'saved.log'), log_path)
+    app.record_store.invalidate()
+    assert keyed(app.record_store.rows('students.csv')) == current
+    assert len(app.record_store.rows('students.csv')) == len(current)
+
+
+def test_record_store_follows_external_edits(data_dir):
+    rows = app.record_store.rows('students.csv')
+    count = len(rows)
+
+    append_line(data_dir / 'students.csv', 'Eve,Stone,eve@sjsu,CS101,A,100')
+    assert len(app.record_store.rows('students.csv')) == count + 1
+    assert app.record_store.lookup('students.csv', 'email', 'eve@sjsu')
+
+    # Another program rewrites the file in place of the old one
+    path = data_dir / 'students.csv'
+    lines = path.read_text(encoding='utf-8').splitlines()
+    replacement = data_dir / 'students.csv.new'
+    replacement.write_text('\n'.join(line for line in lines if 'eve@sjsu' not in line) + '\n', encoding='utf-8')
+    os.replace(replacement, path)
+    assert len(app.record_store.rows('students.csv')) == count
+    assert not app.record_store.lookup('students.csv', 'email', 'eve@sjsu')
@@ -0,0 +1,10 @@
+from conftest import app, append_line
+
+
+def test_is_enrolled_is_a_point_lookup_on_a_large_table(data_dir, monkeypatch):
+    monkeypatch.setattr(app.OffsetIndex, 'MIN_BYTES', 0)
+    append_line(data_dir / 'students.csv', 'Eve,Stone,eve@sjsu,CS101,A,100')
+
+    assert app.GradeValidator.is_enrolled('eve@sjsu', 'CS101')
+    assert not app.GradeValidator.is_enrolled('eve@sjsu', 'CS102')
+    assert 'students.csv' not in app.record_store.tables